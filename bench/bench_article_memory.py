@@ -0,0 +1,101 @@
+"""
+对比 ArticleDB 两种内存表示 (每篇一个 dict / 紧凑记录) 的常驻内存与加载耗时。
+
+用法: python bench/bench_article_memory.py [--articles 100000]
+
+每种组合在独立子进程中加载，避免互相影响内存读数。
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def synthetic_inventory(n: int, seed: int = 42) -> dict:
+    """生成与线上结构一致的合成库存：文章/微头条/视频混合，部分已失效"""
+    rng = random.Random(seed)
+    today = date.today()
+    articles = {}
+    for i in range(n):
+        kind = rng.choices(["article", "w", "video"], weights=[70, 25, 5])[0]
+        aid = 7_500_000_000_000_000_000 + i if kind != "w" else 1_860_000_000_000_000 + i
+        url = f"https://www.toutiao.com/{kind}/{aid}/"
+        read_count = rng.choice([0, 0, 1, 3, 8, 15, 25, 40, 60])
+        last_read = "" if read_count == 0 else (today - timedelta(days=rng.randint(0, 60))).isoformat()
+        articles[url] = {
+            "title": f"合成文章标题 {i} " + "测" * rng.randint(5, 30),
+            "url": url,
+            "status": "invalid" if rng.random() < 0.05 else "active",
+            "last_read_at": last_read,
+            "read_count": read_count,
+        }
+    return {"last_sync_date": today.isoformat(), "articles": articles}
+
+
+CHILD = r"""
+import sys, time
+from pathlib import Path
+sys.path.insert(0, {root!r})
+
+def rss_kb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+import scrape_toutiao
+before = rss_kb()
+start = time.perf_counter()
+db = scrape_toutiao.ArticleDB(Path({path!r}), mode="snapshot", compact={compact})
+elapsed = time.perf_counter() - start
+after = rss_kb()
+print(f"{{db.article_count()}} {{elapsed:.4f}} {{after - before}}")
+"""
+
+
+def measure(path: Path, compact: bool):
+    code = CHILD.format(root=str(ROOT), path=str(path), compact=compact)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    count, elapsed, rss_kb = out.stdout.strip().splitlines()[-1].split()
+    return int(count), float(elapsed), int(rss_kb)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    import scrape_toutiao
+
+    data = synthetic_inventory(args.articles)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "bench_db.json"
+        json_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        lines_path = Path(tmp) / "bench_db.jsonl"
+        lines_path.write_text(scrape_toutiao.ArticleDB._dump_lines(data), encoding="utf-8")
+        del data
+
+        print(f"合成库存: {args.articles} 篇")
+        print(f"{'文件格式':<8}{'内存表示':<10}{'加载耗时(s)':>12}{'常驻内存增量(MB)':>18}")
+        for path in (json_path, lines_path):
+            for compact in (False, True):
+                count, elapsed, rss_kb = measure(path, compact)
+                assert count == args.articles
+                label = "紧凑记录" if compact else "dict"
+                print(f"{path.suffix:<12}{label:<12}{elapsed:>12.3f}{rss_kb / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+文章库热点操作的微基准：对比各存储后端与库规模下的耗时和峰值内存。
+
+用法: python bench/bench_db.py [--sizes 1000,10000,100000] [--backends json,journal,lines,compact,sqlite]
+                               [--no-memory] [--json bench_db_results.json]
+
+每个 (后端, 规模) 组合在新的临时目录里依次执行：
+  load                 打开库 (ArticleDB._load + 建索引；SQLite 为建立连接)
+  save                 整库落盘 (SQLite 为 WAL checkpoint)
+  add_articles         20 批、每批 50 条，其中一半是库中已有的链接
+  record_read x30      随机 30 篇各记一次阅读
+  get_weighted_candidates
+耗时与峰值内存分两遍测量 (tracemalloc 会拖慢执行)，每遍都从相同的初始文件开始。
+库上不挂后台写盘器，JSON 后端的每次变更都同步落盘，测到的是未合并写出时的开销。
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import scrape_toutiao as st  # noqa: E402
+from bench_article_memory import synthetic_inventory  # noqa: E402
+
+BACKENDS = {
+    # 名称: (初始文件后缀, 打开方式)
+    "json": (".json", lambda path: st.ArticleDB(path, mode="snapshot")),
+    "journal": (".json", lambda path: st.ArticleDB(path, mode="journal")),
+    "lines": (".jsonl", lambda path: st.ArticleDB(path, mode="snapshot")),
+    "compact": (".json", lambda path: st.ArticleDB(path, mode="snapshot", compact=True)),
+    "sqlite": (".sqlite3", lambda path: st.SQLiteArticleDB(path)),
+}
+ADD_BATCHES = 20
+BATCH_SIZE = 50
+READS = 30
+
+
+def write_templates(size: int, workdir: Path) -> dict:
+    """为每种初始文件格式各生成一份同内容的库文件"""
+    data = synthetic_inventory(size)
+    json_path = workdir / f"template_{size}.json"
+    json_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    lines_path = workdir / f"template_{size}.jsonl"
+    lines_path.write_text(st.ArticleDB._dump_lines(data), encoding="utf-8")
+    sqlite_path = workdir / f"template_{size}.sqlite3"
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = st.SQLiteArticleDB(sqlite_path, import_from=json_path)
+        db.close()
+    return {".json": json_path, ".jsonl": lines_path, ".sqlite3": sqlite_path}
+
+
+def make_batches(urls: list, rng: random.Random) -> list:
+    """每批一半已有链接、一半新链接，模拟增量同步时信息流与库存的重叠"""
+    batches = []
+    for b in range(ADD_BATCHES):
+        known = rng.sample(urls, BATCH_SIZE // 2)
+        fresh = [
+            f"https://www.toutiao.com/article/{7_600_000_000_000_000_000 + b * BATCH_SIZE + i}/"
+            for i in range(BATCH_SIZE - len(known))
+        ]
+        batches.append([{"href": url, "text": f"基准新增 {url[-8:-1]}"} for url in known + fresh])
+    return batches
+
+
+def run_ops(backend: str, template: Path, workdir: Path, urls: list, trace: bool) -> dict:
+    suffix, opener = BACKENDS[backend]
+    path = workdir / f"db{suffix}"
+    for stale in workdir.glob("db*"):
+        stale.unlink()
+    shutil.copy(template, path)
+    rng = random.Random(7)
+    batches = make_batches(urls, rng)
+    reads = rng.sample(urls, READS)
+    results = {}
+
+    def measure(name, fn):
+        random.seed(11)
+        if trace:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = fn()
+        elapsed = time.perf_counter() - start
+        if trace:
+            results[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            results[name] = elapsed
+        return value
+
+    db = measure("load", lambda: opener(path))
+    if backend == "sqlite":
+        measure("save", lambda: db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)"))
+    else:
+        measure("save", db.save)
+    measure("add_articles", lambda: [db.add_articles(batch) for batch in batches])
+    measure("record_read_x30", lambda: [db.record_read(url) for url in reads])
+    measure("get_weighted_candidates", db.get_weighted_candidates)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--no-memory", action="store_true", help="跳过 tracemalloc 峰值内存测量")
+    parser.add_argument("--json", default="bench_db_results.json", help="结果 JSON 路径")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    backends = [b for b in args.backends.split(",") if b.strip()]
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"未知后端: {backend} (可选: {', '.join(BACKENDS)})")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for size in sizes:
+            templates = write_templates(size, workdir)
+            urls = list(synthetic_inventory(size)["articles"])
+            for backend in backends:
+                template = templates[BACKENDS[backend][0]]
+                timings = run_ops(backend, template, workdir, urls, trace=False)
+                peaks = {} if args.no_memory else run_ops(backend, template, workdir, urls, trace=True)
+                for op, seconds in timings.items():
+                    results.append({
+                        "backend": backend,
+                        "articles": size,
+                        "op": op,
+                        "seconds": round(seconds, 6),
+                        "peak_bytes": peaks.get(op),
+                    })
+
+    print(f"{'后端':<10}{'规模':>8}  {'操作':<26}{'耗时(ms)':>12}{'峰值内存(KB)':>14}")
+    for r in results:
+        peak = f"{r['peak_bytes'] / 1024:>14.1f}" if r["peak_bytes"] is not None else f"{'-':>14}"
+        print(f"{r['backend']:<12}{r['articles']:>8}  {r['op']:<26}{r['seconds'] * 1000:>12.2f}{peak}")
+
+    meta = {"python": sys.version.split()[0], "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+    Path(args.json).write_text(
+        json.dumps({"meta": meta, "results": results}, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(f"[BENCH] 结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
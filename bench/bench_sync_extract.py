@@ -0,0 +1,164 @@
+"""
+离线测量链接提取与同步耗时：用 fixture_server.py 的假主页代替线上页面。
+
+用法: python bench/bench_sync_extract.py [--sizes 500,2000,5000] [--sync-sizes 100,300]
+                                         [--max-extract-ms 250] [--max-sync-seconds 180]
+                                         [--json result.json]
+
+1. 提取：整页渲染 N 张卡片，测 EXTRACT_LINKS_JS 单次调用耗时，并核对提取条数；
+   再测增量收集 (HARVEST_LINKS_JS) 在追加一页卡片后的单次调用耗时。
+2. 同步：信息流共 N 条、滚动加载，对空库完整执行 sync_task，测总耗时与入库篇数。
+超过阈值时以非零状态退出，可用于 CI 回归检查。需要已安装 Playwright 及 Chromium。
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_server import start_server  # noqa: E402
+
+# 追加一页卡片，用来测量增量收集只处理新节点时的开销
+APPEND_PAGE_JS = r"""
+(count) => {
+  const feed = document.querySelector(".profile-feed");
+  const start = feed.children.length;
+  for (let i = start; i < start + count; i++) {
+    feed.appendChild(renderCard({group_id_str: String(7300000000000000000n + BigInt(i) + 1000000n),
+                                 title: "追加文章标题 " + i}));
+  }
+}
+"""
+
+
+async def bench_extract(st, browser, base: str, sizes: list, repeat: int) -> list:
+    results = []
+    page = await browser.new_page()
+    try:
+        for size in sizes:
+            await page.goto(f"{base}/c/user/token/fixture/?total={size}&initial={size}",
+                            wait_until="domcontentloaded")
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                links = await page.evaluate(st.EXTRACT_LINKS_JS)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+
+            await page.evaluate(st.HARVEST_LINKS_JS)
+            harvest = []
+            for _ in range(repeat):
+                await page.evaluate(APPEND_PAGE_JS, 20)
+                start = time.perf_counter()
+                await page.evaluate(st.HARVEST_LINKS_JS)
+                harvest.append((time.perf_counter() - start) * 1000)
+            harvest.sort()
+
+            result = {
+                "cards": size,
+                "links": len(links),
+                "extract_ms": round(timings[len(timings) // 2], 2),
+                "harvest_ms": round(harvest[len(harvest) // 2], 2),
+            }
+            results.append(result)
+            print(f"[BENCH] 提取 {size:>6} 张卡片: 全量 {result['extract_ms']:>8.2f} ms/次，"
+                  f"增量 {result['harvest_ms']:>6.2f} ms/次，提取 {len(links)} 条")
+    finally:
+        await page.close()
+    return results
+
+
+async def bench_sync(st, browser, base: str, sizes: list) -> list:
+    results = []
+    for size in sizes:
+        st.TOUTIAO_URL = f"{base}/c/user/token/fixture/?total={size}"
+        db_path = Path(tempfile.mkdtemp(dir=st.DATA_DIR)) / "bench_db.json"
+        db = st.ArticleDB(db_path, mode="snapshot")
+        context = await browser.new_context(viewport={"width": 1440, "height": 900})
+        start = time.perf_counter()
+        try:
+            await st.sync_task(context, db)
+        finally:
+            await context.close()
+        elapsed = time.perf_counter() - start
+        result = {"feed": size, "articles": db.article_count(), "sync_seconds": round(elapsed, 2)}
+        results.append(result)
+        print(f"[BENCH] 同步 信息流 {size:>5} 条: 耗时 {elapsed:.1f}s，入库 {result['articles']} 篇")
+    return results
+
+
+async def run(args) -> dict:
+    from playwright.async_api import async_playwright
+
+    server, base = start_server(0, args.latency_ms)
+    # 调试产物与数据库都写到临时目录，不影响仓库里的 data/
+    workdir = tempfile.mkdtemp(prefix="toutiao_bench_")
+    os.chdir(workdir)
+    sys.path.insert(0, str(ROOT))
+    import scrape_toutiao as st
+
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                extract = await bench_extract(st, browser, base, args.sizes, args.repeat)
+                sync = await bench_sync(st, browser, base, args.sync_sizes)
+            finally:
+                await browser.close()
+    finally:
+        server.shutdown()
+    return {"extract": extract, "sync": sync}
+
+
+def check_thresholds(result: dict, args) -> list:
+    failures = []
+    for r in result["extract"]:
+        if r["links"] != r["cards"]:
+            failures.append(f"{r['cards']} 张卡片提取出 {r['links']} 条链接")
+        if r["extract_ms"] > args.max_extract_ms:
+            failures.append(f"{r['cards']} 张卡片全量提取 {r['extract_ms']} ms > {args.max_extract_ms} ms")
+    for r in result["sync"]:
+        if r["sync_seconds"] > args.max_sync_seconds:
+            failures.append(f"信息流 {r['feed']} 条同步 {r['sync_seconds']}s > {args.max_sync_seconds}s")
+        if r["articles"] == 0:
+            failures.append(f"信息流 {r['feed']} 条同步未入库任何文章")
+    return failures
+
+
+def _sizes(text: str) -> list:
+    return [int(s) for s in text.split(",") if s.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=_sizes, default=[500, 2000, 5000])
+    parser.add_argument("--sync-sizes", type=_sizes, default=[100, 300])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=int, default=150, help="假信息流接口的响应延迟")
+    parser.add_argument("--max-extract-ms", type=float, default=250.0)
+    parser.add_argument("--max-sync-seconds", type=float, default=180.0)
+    parser.add_argument("--json", help="结果另存为 JSON")
+    args = parser.parse_args()
+    # run() 会切换到临时工作目录，结果路径先转成绝对路径
+    json_path = Path(args.json).resolve() if args.json else None
+
+    result = asyncio.run(run(args))
+    if json_path:
+        json_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    failures = check_thresholds(result, args)
+    for failure in failures:
+        print(f"[BENCH] ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("[BENCH] ✅ 全部在阈值内")
+
+
+if __name__ == "__main__":
+    main()
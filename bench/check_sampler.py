@@ -0,0 +1,133 @@
+"""
+检验按档抽样 (sample_tiers) 与原先逐篇 random.choices + pop 的不放回加权抽样分布一致。
+
+用法: python bench/check_sampler.py [--trials 20000] [--seed 20240601] [--alpha 0.001]
+
+对同一批合成文章 (各权重档篇数不同) 两种抽样各重复 trials 次，比较：
+  首篇分布   每篇被第一个抽中的次数，另与理论概率 w_i / Σw 做拟合优度检验
+  入选分布   每篇出现在当天计划中的次数
+用卡方齐性检验 (2 × 篇数 列联表)，统计量超过 1-alpha 分位数即判为不一致，以非零状态退出。
+入选次数并非独立多项抽样 (不放回)，方差比多项分布小，因此这一检验偏保守。
+"""
+import argparse
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scrape_toutiao as st  # noqa: E402
+
+# 各档篇数 (与 TIER_WEIGHTS 对应) 与每次抽取篇数
+TIER_SIZES = [4, 6, 8, 5, 7]
+K = 10
+
+# 标准正态分布上分位点，供卡方分位数近似
+Z_UPPER = {0.05: 1.6449, 0.01: 2.3263, 0.001: 3.0902}
+
+
+def population() -> list:
+    """按档位展开成逐篇权重列表，下标 = 档位起点 + 档内位置"""
+    weights = []
+    for size, weight in zip(TIER_SIZES, st.TIER_WEIGHTS):
+        weights.extend([weight] * size)
+    return weights
+
+
+def legacy_sample(weights: list, k: int) -> list:
+    """改动前 get_weighted_candidates 的抽样循环"""
+    temp_cand = list(range(len(weights)))
+    temp_weight = list(weights)
+    selected = []
+    for _ in range(k):
+        if not temp_cand:
+            break
+        chosen = random.choices(temp_cand, weights=temp_weight, k=1)[0]
+        selected.append(chosen)
+        idx = temp_cand.index(chosen)
+        temp_cand.pop(idx)
+        temp_weight.pop(idx)
+    return selected
+
+
+def tier_sample(k: int) -> list:
+    offsets = [sum(TIER_SIZES[:t]) for t in range(len(TIER_SIZES))]
+    return [offsets[tier] + pos for tier, pos in st.sample_tiers(TIER_SIZES, st.TIER_WEIGHTS, k)]
+
+
+def collect(sampler, n_items: int, trials: int):
+    first = [0] * n_items
+    included = [0] * n_items
+    for _ in range(trials):
+        picks = sampler()
+        assert len(picks) == len(set(picks)), "同一次计划里出现重复文章"
+        first[picks[0]] += 1
+        for i in picks:
+            included[i] += 1
+    return first, included
+
+
+def chi2_homogeneity(a: list, b: list):
+    """两组计数的卡方齐性检验，返回 (统计量, 自由度)"""
+    total_a, total_b = sum(a), sum(b)
+    total = total_a + total_b
+    stat = 0.0
+    df = -1
+    for x, y in zip(a, b):
+        col = x + y
+        if not col:
+            continue
+        df += 1
+        for observed, row_total in ((x, total_a), (y, total_b)):
+            expected = row_total * col / total
+            stat += (observed - expected) ** 2 / expected
+    return stat, df
+
+
+def chi2_goodness(observed: list, probs: list):
+    n = sum(observed)
+    stat = sum((o - n * p) ** 2 / (n * p) for o, p in zip(observed, probs))
+    return stat, len(observed) - 1
+
+
+def chi2_critical(df: int, alpha: float) -> float:
+    """Wilson-Hilferty 近似的卡方上分位数"""
+    z = Z_UPPER[alpha]
+    return df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=20240601)
+    parser.add_argument("--alpha", type=float, choices=sorted(Z_UPPER), default=0.001)
+    args = parser.parse_args()
+
+    weights = population()
+    n_items = len(weights)
+    random.seed(args.seed)
+    old_first, old_included = collect(lambda: legacy_sample(weights, K), n_items, args.trials)
+    random.seed(args.seed + 1)
+    new_first, new_included = collect(lambda: tier_sample(K), n_items, args.trials)
+
+    total_weight = sum(weights)
+    checks = [
+        ("首篇分布 (新 vs 旧)", chi2_homogeneity(old_first, new_first)),
+        ("首篇分布 (新 vs 理论)", chi2_goodness(new_first, [w / total_weight for w in weights])),
+        ("入选分布 (新 vs 旧)", chi2_homogeneity(old_included, new_included)),
+    ]
+    print(f"[CHECK] {n_items} 篇 (各档 {TIER_SIZES})，每次抽 {K} 篇，各 {args.trials} 次，alpha={args.alpha}")
+    failed = False
+    for name, (stat, df) in checks:
+        critical = chi2_critical(df, args.alpha)
+        ok = stat <= critical
+        failed |= not ok
+        print(f"[CHECK] {'✓' if ok else '❌'} {name}: χ²={stat:.1f} (自由度 {df}，临界值 {critical:.1f})")
+    if failed:
+        sys.exit(1)
+    print("[CHECK] ✅ 两种抽样分布一致")
+
+
+if __name__ == "__main__":
+    main()
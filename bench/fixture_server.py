@@ -0,0 +1,213 @@
+"""
+本地假主页：模拟头条个人主页的信息流，供离线调试 EXTRACT_LINKS_JS / sync_task。
+
+用法: python bench/fixture_server.py [--port 8765] [--latency-ms 150]
+      TOUTIAO_URL=http://127.0.0.1:8765/c/user/token/fixture/?total=3000 python scrape_toutiao.py
+
+页面参数 (查询字符串):
+  total    信息流总条数 (默认 1000)
+  initial  首屏直接渲染的条数 (默认 20)，等于 total 时整页一次性渲染
+  page     每次滚动加载的条数 (默认 20)
+
+卡片混合文章 / 微头条 / 视频三类，链接使用 https://www.toutiao.com/ 绝对地址
+(与线上一致，提取脚本只接受 toutiao.com 的链接)；页脚带备案、协议等应被过滤的链接。
+滚动到底部时请求 /api/pc/list/user/feed，返回与线上接口字段一致的 JSON 再渲染卡片，
+因此 SYNC_USE_FEED_API 模式也能在本地验证。
+"""
+import argparse
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ARTICLE_BASE = 7_300_000_000_000_000_000
+THREAD_BASE = 1_700_000_000_000_000
+
+
+def feed_item(i: int) -> dict:
+    """第 i 条信息流 (按时间倒序)，字段与线上接口一致"""
+    kind = i % 10
+    if kind in (7, 8):
+        return {
+            "thread_id_str": str(THREAD_BASE + i),
+            "content": f"微头条正文第 {i} 条，记录一下今天看到的新鲜事，配图若干。",
+        }
+    item = {"group_id_str": str(ARTICLE_BASE + i), "title": f"合成文章标题 {i}：一个足够长的标题"}
+    if kind == 9:
+        item["has_video"] = True
+        item["title"] = f"合成视频标题 {i}"
+    return item
+
+
+def expected_href(item: dict) -> str:
+    if "thread_id_str" in item:
+        return f"https://www.toutiao.com/w/{item['thread_id_str']}/"
+    kind = "video" if item.get("has_video") else "article"
+    return f"https://www.toutiao.com/{kind}/{item['group_id_str']}/"
+
+
+# 与服务端 render_card 结构相同，供浏览器端渲染滚动加载的卡片
+CARD_JS = r"""
+function renderCard(item) {
+  const div = document.createElement("div");
+  if (item.thread_id_str) {
+    div.className = "feed-card-wrapper weitoutiao-wrap";
+    div.innerHTML = '<a class="wtt-link" href="https://www.toutiao.com/w/' + item.thread_id_str + '/"></a>' +
+      '<div class="weitoutiao-content"></div>';
+    div.querySelector(".weitoutiao-content").textContent = item.content;
+  } else if (item.has_video) {
+    div.className = "feed-card-wrapper";
+    div.innerHTML = '<a href="https://www.toutiao.com/video/' + item.group_id_str + '/"><img alt=""></a>' +
+      '<div class="video-title"></div>';
+    div.querySelector(".video-title").textContent = item.title;
+  } else {
+    div.className = "feed-card-wrapper";
+    div.innerHTML = '<a class="title" href="https://www.toutiao.com/article/' + item.group_id_str + '/"></a>' +
+      '<p class="abstract">摘要内容占位，摘要内容占位，摘要内容占位。</p>';
+    div.querySelector("a").textContent = item.title;
+  }
+  return div;
+}
+"""
+
+
+def render_card(item: dict) -> str:
+    if "thread_id_str" in item:
+        return (
+            '<div class="feed-card-wrapper weitoutiao-wrap">'
+            f'<a class="wtt-link" href="{expected_href(item)}"></a>'
+            f'<div class="weitoutiao-content">{html.escape(item["content"])}</div></div>'
+        )
+    if item.get("has_video"):
+        return (
+            '<div class="feed-card-wrapper">'
+            f'<a href="{expected_href(item)}"><img alt=""></a>'
+            f'<div class="video-title">{html.escape(item["title"])}</div></div>'
+        )
+    return (
+        '<div class="feed-card-wrapper">'
+        f'<a class="title" href="{expected_href(item)}">{html.escape(item["title"])}</a>'
+        '<p class="abstract">摘要内容占位，摘要内容占位，摘要内容占位。</p></div>'
+    )
+
+
+FOOTER = """
+<footer>
+  <a href="https://www.toutiao.com/c/user/token/other/">其他作者主页</a>
+  <a href="https://www.toutiao.com/a6680000000000000000/">用户协议</a>
+  <a href="https://www.toutiao.com/a6680000000000000001/">隐私政策</a>
+  <a href="https://www.toutiao.com/search/?keyword=123456789">搜索</a>
+  <a href="https://beian.miit.gov.cn/1234567890">京ICP备12025439号</a>
+  <a href="https://www.toutiao.com/a6680000000000000002/">违法和不良信息举报</a>
+</footer>
+"""
+
+PAGE = """<!DOCTYPE html>
+<html lang="zh-CN"><head><meta charset="utf-8"><title>合成作者的主页 - 今日头条</title>
+<style>
+  body {{ font-family: sans-serif; margin: 0 auto; width: 680px; }}
+  .feed-card-wrapper {{ height: 120px; border-bottom: 1px solid #eee; padding: 8px 0; }}
+  footer {{ margin-top: 40px; }}
+</style></head>
+<body>
+<header><a href="https://www.toutiao.com/">今日头条</a></header>
+<div class="profile-feed">{cards}</div>
+<div id="sentinel">加载中...</div>
+{footer}
+<script>
+{card_js}
+const total = {total}, pageSize = {page};
+let offset = {initial}, loading = false;
+const feed = document.querySelector(".profile-feed");
+async function loadMore() {{
+  if (loading || offset >= total) return;
+  loading = true;
+  try {{
+    const resp = await fetch("/api/pc/list/user/feed?offset=" + offset + "&count=" + pageSize + "&total=" + total);
+    const payload = await resp.json();
+    for (const item of payload.data) feed.appendChild(renderCard(item));
+    offset += payload.data.length;
+    if (!payload.has_more) document.getElementById("sentinel").textContent = "没有更多了";
+  }} finally {{
+    loading = false;
+  }}
+}}
+new IntersectionObserver((entries) => {{
+  if (entries.some((e) => e.isIntersecting)) loadMore();
+}}, {{ rootMargin: "600px" }}).observe(document.getElementById("sentinel"));
+</script>
+</body></html>
+"""
+
+
+def _int_arg(query: dict, name: str, default: int) -> int:
+    try:
+        return max(0, int(query.get(name, [default])[0]))
+    except ValueError:
+        return default
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: str, content_type: str):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        total = _int_arg(query, "total", 1000)
+        if url.path.startswith("/api/pc/list/user/feed"):
+            time.sleep(self.latency)
+            offset = _int_arg(query, "offset", 0)
+            count = _int_arg(query, "count", 20)
+            data = [feed_item(i) for i in range(offset, min(offset + count, total))]
+            self._send(json.dumps({"data": data, "has_more": offset + count < total}), "application/json")
+        elif url.path.startswith("/c/user/"):
+            initial = min(_int_arg(query, "initial", 20), total)
+            cards = "".join(render_card(feed_item(i)) for i in range(initial))
+            self._send(PAGE.format(
+                cards=cards, footer=FOOTER, card_js=CARD_JS,
+                total=total, page=_int_arg(query, "page", 20), initial=initial,
+            ), "text/html")
+        elif url.path == "/":
+            self._send("<!DOCTYPE html><html><head><title>今日头条</title></head><body>首页</body></html>", "text/html")
+        else:
+            self.send_error(404)
+
+
+def start_server(port: int = 0, latency_ms: int = 150):
+    """在后台线程启动服务，返回 (server, base_url)；port=0 时自动分配端口"""
+    handler = type("Handler", (FixtureHandler,), {"latency": latency_ms / 1000})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="头条主页信息流的本地假页面")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=150, help="信息流接口的模拟延迟")
+    args = parser.parse_args()
+    server, base = start_server(args.port, args.latency_ms)
+    print(f"[FIXTURE] 主页: {base}/c/user/token/fixture/?total=1000")
+    print(f"[FIXTURE] 热身页: {base}/")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,126 @@
+from __future__ import annotations
+
+import argparse
 import asyncio
+import csv
 import json
 import random
+import re
 import time
 import math
+import os
+import sqlite3
 import sys
-from datetime import datetime
+import threading
+import tracemalloc
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
 
-from playwright.async_api import async_playwright, Page, BrowserContext
+# Playwright 只在启动浏览器时导入，stats/plan/export 等命令不依赖它
+if TYPE_CHECKING:
+    from playwright.async_api import Page, BrowserContext
 
 # ================= 依赖库检测 =================
-try:
-    from playwright_stealth import stealth_async
-    HAS_STEALTH = True
-except ImportError:
-    HAS_STEALTH = False
-    print("================================================================")
-    print(f"[WARN] 未安装 playwright-stealth 库。")
-    print(f"[WARN] 建议运行: pip install playwright-stealth 以降低被检测风险。")
-    print("================================================================")
+
+def check_stealth() -> bool:
+    """启动浏览器前检测 playwright-stealth 是否可用"""
+    try:
+        import playwright_stealth  # noqa: F401
+        return True
+    except ImportError:
+        print("================================================================")
+        print(f"[WARN] 未安装 playwright-stealth 库。")
+        print(f"[WARN] 建议运行: pip install playwright-stealth 以降低被检测风险。")
+        print("================================================================")
+        return False
 
 # ================= 配置区域 =================
 
-TOUTIAO_URL = "https://www.toutiao.com/c/user/token/CiyRLPHkUyTCD9FmHodOGQVcmZh5-NRKyfiTSF0XMms-tSja0FdhrUWRp-T-DBpJCjwAAAAAAAAAAAAAT8lExjCbDHcWTgszQQjqU0Ohh9qtuXbuEOe6CQdqJEZ7yIpoM-NJ93_Sty1iMpOe_FUQ9ZmDDhjDxYPqBCIBA9GPpzc="
+# 目标主页与热身页，可用环境变量覆盖 (例如指向 bench/fixture_server.py 的本地假页面)
+TOUTIAO_URL = os.environ.get("TOUTIAO_URL") or "https://www.toutiao.com/c/user/token/CiyRLPHkUyTCD9FmHodOGQVcmZh5-NRKyfiTSF0XMms-tSja0FdhrUWRp-T-DBpJCjwAAAAAAAAAAAAAT8lExjCbDHcWTgszQQjqU0Ohh9qtuXbuEOe6CQdqJEZ7yIpoM-NJ93_Sty1iMpOe_FUQ9ZmDDhjDxYPqBCIBA9GPpzc="
+TOUTIAO_HOME_URL = os.environ.get("TOUTIAO_HOME_URL") or "https://www.toutiao.com/"
 
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-DB_FILE = DATA_DIR / "toutiao_db.json"
+# 数据库文件格式：
+#   "json"  - 缩进 JSON (原有格式)
+#   "lines" - 首行为元数据，其后每篇文章一行并按 URL 排序，单次变更只改动少数几行
+#             (首次运行时自动从原有的 toutiao_db.json 迁移)
+DB_FILE_FORMAT = "json"
+DB_FILE = DATA_DIR / ("toutiao_db.jsonl" if DB_FILE_FORMAT == "lines" else "toutiao_db.json")
+SQLITE_DB_FILE = DATA_DIR / "toutiao_db.sqlite3"
+# 每次运行一行的指标记录，以及供 node-exporter textfile collector 采集的 OpenMetrics 文件
+METRICS_LOG = DATA_DIR / "run_metrics.jsonl"
+METRICS_TEXTFILE = DATA_DIR / "toutiao_metrics.prom"
+METRICS_KEEP_RUNS = 1000
 DEBUG_DIR = DATA_DIR / "debug"
 DEBUG_DIR.mkdir(parents=True, exist_ok=True)
 
+# 同步进度检查点：每轮提取到的新链接追加一行，同步成功后删除
+SYNC_CHECKPOINT_FILE = DATA_DIR / "sync_checkpoint.jsonl"
 REPORT_FILE = DEBUG_DIR / "read_report.html"
+REPORT_LOG = DEBUG_DIR / "read_report.jsonl"
+ARTIFACT_INDEX = DEBUG_DIR / "artifacts.json"
+# 各阶段耗时记录 (JSONL)，每次运行开始时清空，只保留最近一次
+TRACE_LOG = DEBUG_DIR / "trace.jsonl"
+# --profile 的输出：cProfile 数据 (可用 python -m pstats / snakeviz 打开) 与文字摘要
+PROFILE_FILE = DEBUG_DIR / "profile_latest.pstats"
+PROFILE_SUMMARY = DEBUG_DIR / "profile_latest.txt"
 
 MAX_READ_COUNT = 30
 MIN_READ_COUNT = 5
 MAX_SYNC_SCROLLS = 20
 AGING_THRESHOLD = 50
 MAX_RETRIES = 3
+# 同步时用 MutationObserver 增量收集链接 (False 则每轮全量扫描页面)
+SYNC_INCREMENTAL_HARVEST = True
+# 同步时直接解析主页信息流接口 (XHR) 的 JSON 响应；接口无响应时仍回退 DOM 提取
+SYNC_USE_FEED_API = False
+FEED_API_PATTERNS = ("/api/pc/list/user/feed", "/api/pc/feed/")
+# 增量同步水位线：信息流按时间倒序，连续这么多篇都已在库中即停止滚动
+SYNC_KNOWN_STREAK_STOP = 10
+# 同步滚动后等待信息流新内容的超时 (秒)；到点没有新内容也继续下一轮
+SYNC_WAIT_TIMEOUT = 2.5
+# 重试时快速滚回上次进度的最大滚动次数
+SYNC_RESUME_MAX_STEPS = 80
+# 同步页请求拦截 (可选)：中止图片/媒体/字体以及下列重型第三方/统计域名的请求
+SYNC_BLOCK_RESOURCES = False
+SYNC_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+SYNC_BLOCKED_HOSTS = (
+    "mcs.zijieapi.com", "mon.zijieapi.com",
+    "mcs.snssdk.com", "mon.snssdk.com",
+    "hm.baidu.com", "www.googletagmanager.com", "www.google-analytics.com",
+)
+
+# 数据库存储模式：
+#   "snapshot" - 每次变更整库重写 (原有行为)
+#   "journal"  - 变更以小记录追加到日志文件，加载时重放，定期压缩为快照
+#   "sqlite"   - 存入 SQLITE_DB_FILE (首次打开时自动从 DB_FILE 导入)
+DB_STORAGE_MODE = "snapshot"
+JOURNAL_COMPACT_EVERY = 200
+# 后台写盘器合并写出的间隔 (秒)
+FLUSH_INTERVAL = 5.0
+# 内存中用紧凑记录 (__slots__ + 数字 id 为键 + 状态码/日期序数) 代替每篇一个 dict
+COMPACT_RECORDS = False
+
+
+# 调试截图：JPEG 压缩保存，按类别保留最新若干个，且总大小不超过预算
+SCREENSHOT_QUALITY = 60
+ARTIFACT_BUDGET_BYTES = 20 * 1024 * 1024
+ARTIFACT_KEEP = {
+    "read_start": 5,
+    "read_end": 5,
+    "read_error": 3,
+    "captcha": 3,
+    "sync_success": 1,
+    "sync_debug": 10,
+}
 
 
 # ================= User-Agent 管理 =================
@@ -77,12 +160,9 @@ VIEWPORTS = [
 
 # ================= JS 注入脚本 =================
 
-EXTRACT_LINKS_JS = r"""
-() => {
-  const anchors = Array.from(document.querySelectorAll("a[href]"));
+# 链接识别与标题提取的公共部分，由全量扫描与增量观察器共用
+LINK_HELPERS_JS = r"""
   const origin = window.location.origin;
-  const results = [];
-  const seen = new Set();
 
   const isArticle = (path) => {
     if (!path) return false;
@@ -173,43 +253,776 @@ EXTRACT_LINKS_JS = r"""
     return { text: text || "Untitled", contentType };
   };
 
-  for (const a of anchors) {
+  const filterKeywords = [
+      '跟帖评论自律管理承诺书', '用户协议', '隐私政策',
+      '侵权投诉', '网络谣言曝光台', '违法和不良信息举报', '侵权举报受理公示'
+  ];
+
+  // 单个 <a> 转成 {text, href, type}；非文章、已见过或应过滤时返回 null
+  const collect = (a, seen) => {
     let href = a.getAttribute("href");
-    if (!href) continue;
+    if (!href) return null;
     if (href.startsWith("/")) href = origin + href;
     try {
         const urlObj = new URL(href);
-        if (!urlObj.hostname.includes("toutiao.com")) continue;
-        if (!isArticle(urlObj.pathname)) continue;
+        if (!urlObj.hostname.includes("toutiao.com")) return null;
+        if (!isArticle(urlObj.pathname)) return null;
         const cleanUrl = urlObj.origin + urlObj.pathname;
-        if (seen.has(cleanUrl)) continue;
+        if (seen.has(cleanUrl)) return null;
         const titleInfo = extractTitle(a, urlObj);
         let text = titleInfo.text;
-        const filterKeywords = [
-            '跟帖评论自律管理承诺书', '用户协议', '隐私政策',
-            '侵权投诉', '网络谣言曝光台', '违法和不良信息举报', '侵权举报受理公示'
-        ];
-        if (filterKeywords.some(keyword => text.includes(keyword))) continue;
-        if (!text.startsWith('[') && text.match(/^(备案|举报|登录|下载|广告|相关推荐|搜索)$/)) continue;
+        if (filterKeywords.some(keyword => text.includes(keyword))) return null;
+        if (!text.startsWith('[') && text.match(/^(备案|举报|登录|下载|广告|相关推荐|搜索)$/)) return null;
         seen.add(cleanUrl);
-        results.push({ text: text, href: cleanUrl, type: titleInfo.contentType });
-    } catch(e) {}
+        return { text: text, href: cleanUrl, type: titleInfo.contentType };
+    } catch(e) { return null; }
+  };
+"""
+
+# 全量扫描：每次都遍历页面上所有 a[href]
+EXTRACT_LINKS_JS = r"""
+() => {
+""" + LINK_HELPERS_JS + r"""
+  const results = [];
+  const seen = new Set();
+  for (const a of document.querySelectorAll("a[href]")) {
+    const item = collect(a, seen);
+    if (item) results.push(item);
   }
   return results;
 }
 """
 
+# 增量收集：首次调用时扫描一遍现有节点并注入 MutationObserver，
+# 之后只处理新插入的节点，新条目缓存在页面里；每次调用取走并清空缓存。
+HARVEST_LINKS_JS = r"""
+() => {
+  if (!window.__ttHarvest) {
+""" + LINK_HELPERS_JS + r"""
+    const state = { seen: new Set(), buffer: [] };
+    const scan = (node) => {
+      if (node.nodeType !== 1) return;
+      if (node.matches("a[href]")) {
+        const item = collect(node, state.seen);
+        if (item) state.buffer.push(item);
+      }
+      for (const a of node.querySelectorAll("a[href]")) {
+        const item = collect(a, state.seen);
+        if (item) state.buffer.push(item);
+      }
+    };
+    scan(document.body);
+    state.observer = new MutationObserver((mutations) => {
+      for (const m of mutations) {
+        for (const node of m.addedNodes) scan(node);
+      }
+    });
+    state.observer.observe(document.body, { childList: true, subtree: true });
+    window.__ttHarvest = state;
+  }
+  const out = window.__ttHarvest.buffer;
+  window.__ttHarvest.buffer = [];
+  return out;
+}
+"""
+
+
+def _truncate(text: str, max_length: int) -> str:
+    if not text or len(text) <= max_length:
+        return text
+    return text[:max_length] + "..."
+
+
+def parse_feed_payload(payload) -> list:
+    """
+    从信息流接口的 JSON 中解析出 {text, href, type} 条目，格式与 EXTRACT_LINKS_JS 一致。
+    微头条只有正文没有标题，按页面提取的规则截取前 40 字。
+    """
+    items = []
+    entries = payload.get("data") if isinstance(payload, dict) else None
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        thread_id = str(entry.get("thread_id_str") or entry.get("thread_id") or "")
+        group_id = str(entry.get("group_id_str") or entry.get("group_id") or entry.get("item_id") or "")
+        if thread_id.isdigit() and len(thread_id) > 5:
+            aid, kind, content_type = thread_id, "w", "weitoutiao"
+        elif group_id.isdigit() and len(group_id) > 5:
+            aid = group_id
+            if entry.get("has_video") or entry.get("video_id"):
+                kind, content_type = "video", "video"
+            else:
+                kind, content_type = "article", "article"
+        else:
+            continue
+
+        text = (entry.get("title") or "").strip()
+        if not text and content_type == "weitoutiao":
+            text = _truncate((entry.get("content") or "").strip(), 40)
+        if not text:
+            text = {"weitoutiao": "[微头条]", "video": "[视频]"}.get(content_type, "Untitled")
+        items.append({
+            "text": text,
+            "href": f"https://www.toutiao.com/{kind}/{aid}/",
+            "type": content_type,
+        })
+    return items
+
+
+class LinkHarvester:
+    """
+    同步阶段的链接收集器，按首次出现顺序累计去重后的链接。
+    增量模式下每轮只从页面取回新插入节点里的条目，提取开销不随信息流变长而增长；
+    注入失败时回退为每轮全量执行 EXTRACT_LINKS_JS。
+    接口模式下监听信息流 XHR 响应直接解析条目；首屏卡片随页面直出、不经过接口，
+    因此至少做过一次 DOM 提取后，收到过接口数据时才只用接口数据。
+    """
+
+    def __init__(self, incremental: bool = SYNC_INCREMENTAL_HARVEST, use_feed_api: bool = SYNC_USE_FEED_API,
+                 on_new=None):
+        self.incremental = incremental
+        self.use_feed_api = use_feed_api
+        # 每轮发现新链接时回调 on_new(new_items)，用于写同步检查点
+        self.on_new = on_new
+        self.links = []
+        self.seeded = 0
+        self._seen = set()
+        # 本次尝试页面实际返回过的链接 (与 seed 去重之前)，用来判断页面是否有内容
+        self._page_urls = set()
+        self._api_items = []
+        self.api_responses = 0
+        self.dom_rounds = 0
+
+    def attach(self, page: Page):
+        """在页面导航前调用，开始监听信息流接口响应"""
+        if self.use_feed_api:
+            page.on("response", self._on_response)
+
+    async def _on_response(self, response):
+        if not any(pattern in response.url for pattern in FEED_API_PATTERNS):
+            return
+        try:
+            if response.status != 200:
+                return
+            items = parse_feed_payload(await response.json())
+        except Exception as e:
+            print(f"[SYNC] ⚠ 信息流接口解析失败: {e}")
+            return
+        self.api_responses += 1
+        self._api_items.extend(items)
+
+    def _merge(self, items) -> list:
+        new_items = []
+        for item in items or []:
+            if item['href'] in self._seen:
+                continue
+            self._seen.add(item['href'])
+            new_items.append(item)
+        self.links.extend(new_items)
+        return new_items
+
+    def seed(self, items):
+        """预先放入上次尝试已收集的链接，之后只把新链接计为本轮新增"""
+        self.seeded += len(self._merge(items))
+
+    @property
+    def harvested(self) -> int:
+        """本次尝试新增的链接数 (不含 seed 放入的)，用于提前结束的判断"""
+        return len(self.links) - self.seeded
+
+    @property
+    def page_links(self) -> int:
+        """本次尝试页面返回的链接数，含上次已收集过的"""
+        return len(self._page_urls)
+
+    async def collect(self, page: Page) -> list:
+        """收集一轮，返回本轮新发现的链接"""
+        new_items = await self._collect(page)
+        if new_items and self.on_new is not None:
+            self.on_new(new_items)
+        return new_items
+
+    async def _collect(self, page: Page) -> list:
+        new_items = []
+        if self.api_responses:
+            api_items, self._api_items = self._api_items, []
+            new_items = self._merge_page(api_items)
+            if self.dom_rounds:
+                return new_items
+        return new_items + self._merge_page(await self._extract_dom(page))
+
+    def _merge_page(self, items) -> list:
+        self._page_urls.update(item['href'] for item in items or [])
+        return self._merge(items)
+
+    async def _extract_dom(self, page: Page) -> list:
+        if self.incremental:
+            try:
+                # 页面刷新后观察器随之消失，脚本会自动重新注入
+                count_round_trip("harvest")
+                with TRACER.span("extract", mode="harvest"):
+                    items = await page.evaluate(HARVEST_LINKS_JS)
+                self.dom_rounds += 1
+                return items
+            except Exception as e:
+                print(f"[SYNC] ⚠ 增量收集失败，回退全量扫描: {e}")
+                self.incremental = False
+        count_round_trip("extract")
+        with TRACER.span("extract", mode="full"):
+            items = await page.evaluate(EXTRACT_LINKS_JS)
+        self.dom_rounds += 1
+        return items
+
+
+class SyncCheckpoint:
+    """
+    同步进度的旁路文件 (JSONL)：每轮提取到的新链接连同当时页面上的链接数 (深度) 追加一行。
+    某次尝试中途失败 (验证码、超时、进程被杀) 时已收集的链接不会丢失，
+    下一次尝试先快速滚到记录的深度再继续收集；同步成功后删除。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self):
+        """返回 (已收集的链接, 深度)；深度只对当天的记录有效，否则为 0"""
+        items, depth, day = [], 0, ""
+        if not self.path.exists():
+            return items, depth
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 进程被杀时最后一行可能只写了一半
+                        continue
+                    items.extend(record.get("items", []))
+                    depth = max(depth, record.get("depth", 0))
+                    day = record.get("date", day)
+        except Exception as e:
+            print(f"[WARN] 读取同步检查点失败: {e}")
+        if day != datetime.now().strftime("%Y-%m-%d"):
+            depth = 0
+        return items, depth
+
+    def append(self, items: list, depth: int):
+        record = {"date": datetime.now().strftime("%Y-%m-%d"), "depth": depth, "items": items}
+        try:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"[WARN] 写入同步检查点失败: {e}")
+
+    def clear(self):
+        try:
+            self.path.unlink(missing_ok=True)
+        except Exception as e:
+            print(f"[WARN] 清理同步检查点失败: {e}")
+
+
+# ================= 后台写盘 =================
+
+class BackgroundWriter:
+    """
+    后台落盘：热路径只登记待写内容，由一个定时任务合并后放到线程池里写盘，
+    事件循环 (驱动 Playwright 的那个) 不再被文件 I/O 阻塞。
+    每个 sink 是一个无参函数，在事件循环线程里取走待写内容，
+    返回要在线程池中执行的写盘函数；没有待写内容时返回 None。
+    """
+
+    def __init__(self, interval: float = FLUSH_INTERVAL):
+        self.interval = interval
+        self._sinks = []
+        self._task = None
+        self._lock = None
+        self._stopping = None
+        # 线程池里的写盘函数逐个执行，即使等待它的协程被取消也不会与下一次写盘重叠
+        self._job_lock = threading.Lock()
+
+    def register(self, sink, span: str = None):
+        """span 不为空时，每次写盘记为一个同名的耗时阶段"""
+        self._sinks.append((sink, span))
+
+    def start(self):
+        self._lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def _run_job(self, job):
+        with self._job_lock:
+            job()
+
+    async def flush(self):
+        if self._lock is None:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            for sink, span in self._sinks:
+                job = sink()
+                if job is None:
+                    continue
+                try:
+                    if span is None:
+                        await loop.run_in_executor(None, self._run_job, job)
+                        continue
+                    with TRACER.span(span):
+                        await loop.run_in_executor(None, self._run_job, job)
+                except Exception as e:
+                    print(f"[WARN] 后台写盘失败: {e}")
+
+    async def stop(self):
+        """停止定时任务 (等进行中的写盘完成，不在写到一半时取消)，并把剩余内容全部写出"""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+class JsonlLog:
+    """追加写的 JSONL 文件；挂上 BackgroundWriter 后 append 只入队"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._pending = None
+
+    def append(self, record: dict):
+        if self._pending is not None:
+            self._pending.append(record)
+            return
+        self._write([record])
+
+    def _write(self, records):
+        try:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        except Exception as e:
+            print(f"[WARN] 写入 {self.path.name} 失败: {e}")
+
+    def attach_writer(self, writer: BackgroundWriter, span: str = None):
+        self._pending = []
+        writer.register(self._take_pending, span)
+
+    def _take_pending(self):
+        if not self._pending:
+            return None
+        records, self._pending = self._pending, []
+        return lambda: self._write(records)
+
+
+# ================= 耗时追踪 =================
+
+def _percentile(sorted_values: list, q: float) -> float:
+    """最近秩百分位，sorted_values 需已排序且非空"""
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Tracer:
+    """
+    按阶段记录耗时 (span)：名称、开始时间、耗时、结果，逐条写入 JSONL，
+    运行结束时汇总各阶段的 p50/p95 和最慢的若干次。
+    另外统计页面 CDP 往返次数等计数，随汇总一起输出。
+    """
+
+    def __init__(self, path: Path):
+        self.log = JsonlLog(path)
+        self.run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.spans = []
+        self.counters = {}
+        self._run_start = time.perf_counter()
+
+    def start_run(self):
+        """清空上一次运行的记录"""
+        try:
+            self.log.path.unlink(missing_ok=True)
+        except Exception as e:
+            print(f"[WARN] 清理 {self.log.path.name} 失败: {e}")
+
+    def begin(self, name: str, **attrs) -> dict:
+        span = {"run": self.run_id, "name": name, "start": round(time.time(), 3), **attrs}
+        span["_t0"] = time.perf_counter()
+        return span
+
+    def end(self, span: dict, outcome: str = "ok", error: str = None):
+        span["duration"] = round(time.perf_counter() - span.pop("_t0"), 4)
+        span.setdefault("outcome", outcome)
+        if error:
+            span["error"] = error[:200]
+        self.spans.append(span)
+        self.log.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """with 块内抛出异常时记为 error 并继续抛出；块内可直接设置 span["outcome"]"""
+        span = self.begin(name, **attrs)
+        try:
+            yield span
+        except BaseException as e:
+            self.end(span, "error", f"{type(e).__name__}: {e}")
+            raise
+        self.end(span)
+
+    def count(self, label: str, n: int = 1):
+        self.counters[label] = self.counters.get(label, 0) + n
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._run_start
+
+    def finish_run(self):
+        """追加一条整次运行的记录 (总耗时与计数)"""
+        self.log.append({
+            "run": self.run_id,
+            "name": "run",
+            "duration": round(self.elapsed(), 4),
+            "counters": self.counters,
+        })
+
+    def summary(self, slowest: int = 5) -> str:
+        lines = []
+        if self.spans:
+            by_name = {}
+            for span in self.spans:
+                by_name.setdefault(span["name"], []).append(span["duration"])
+            lines.append(f"[TRACE] 阶段耗时 (共 {len(self.spans)} 段):")
+            lines.append(f"        {'阶段':<14}{'次数':>6}{'合计':>9}{'p50':>9}{'p95':>9}{'最大':>9}")
+            for name, durations in sorted(by_name.items(), key=lambda item: -sum(item[1])):
+                durations.sort()
+                lines.append(
+                    f"        {name:<14}{len(durations):>6}{sum(durations):>8.2f}s"
+                    f"{_percentile(durations, 0.5):>8.2f}s{_percentile(durations, 0.95):>8.2f}s"
+                    f"{durations[-1]:>8.2f}s"
+                )
+            lines.append(f"[TRACE] 最慢的 {min(slowest, len(self.spans))} 段:")
+            for span in sorted(self.spans, key=lambda s: -s["duration"])[:slowest]:
+                extra = "".join(
+                    f" {k}={v}" for k, v in span.items()
+                    if k not in ("run", "name", "start", "duration", "outcome", "error")
+                )
+                lines.append(f"        {span['name']}{extra}: {span['duration']:.2f}s ({span['outcome']})")
+        if self.counters:
+            summary = ", ".join(f"{k} {v}" for k, v in self.counters.items())
+            lines.append(f"[STATS] 页面 CDP 往返次数: {summary}")
+        return "\n".join(lines)
+
+
+TRACER = Tracer(TRACE_LOG)
+
+
+# ================= 运行指标 =================
+
+# (字段, OpenMetrics 指标名, 说明)；不适用的字段 (如当次未同步时的同步指标) 不输出
+METRIC_FIELDS = (
+    ("run_seconds", "toutiao_run_duration_seconds", "整次运行耗时"),
+    ("sync_seconds", "toutiao_sync_duration_seconds", "同步任务耗时 (含重试)"),
+    ("links_harvested", "toutiao_sync_links_harvested", "同步收集到的链接数"),
+    ("new_articles", "toutiao_sync_new_articles", "同步新增文章数"),
+    ("captcha_hits", "toutiao_captcha_hits", "触发验证码次数"),
+    ("reads_success", "toutiao_reads_success", "阅读成功篇数"),
+    ("reads_failed", "toutiao_reads_failed", "阅读失败篇数"),
+    ("reads_invalid", "toutiao_reads_invalid", "标记失效篇数"),
+    ("reads_captcha", "toutiao_reads_captcha", "阅读时遇到验证码篇数"),
+    ("articles_total", "toutiao_articles_total", "库存文章数"),
+    ("db_bytes", "toutiao_db_size_bytes", "数据库文件大小"),
+    ("db_save_seconds", "toutiao_db_save_seconds", "本次运行写盘总耗时"),
+)
+
+
+# 计数类指标每次运行都从 0 开始并全部输出，没发生也记 0，
+# 否则 .prom 里会残留上次的值，多次运行的均值也只统计了非零的几次
+METRIC_COUNTERS = ("captcha_hits", "reads_success", "reads_failed", "reads_invalid", "reads_captcha")
+
+
+class RunMetrics:
+    """
+    单次运行的指标：运行中累加计数，结束时补上耗时与库存信息，
+    追加到 METRICS_LOG 并写出 OpenMetrics 文本文件。
+    """
+
+    def __init__(self, log_path: Path, textfile: Path):
+        self.log_path = log_path
+        self.textfile = textfile
+        self.values = dict.fromkeys(METRIC_COUNTERS, 0)
+
+    def inc(self, field: str, n: int = 1):
+        self.values[field] = self.values.get(field, 0) + n
+
+    def set(self, field: str, value):
+        self.values[field] = value
+
+    def finish(self, db_path: Path, tracer: Tracer) -> dict:
+        """db_path 在数据库关闭后再统计大小 (SQLite 此时已合并 WAL)"""
+        durations = {}
+        for span in tracer.spans:
+            durations[span["name"]] = durations.get(span["name"], 0.0) + span["duration"]
+        record = {
+            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "run_seconds": round(tracer.elapsed(), 1),
+            **self.values,
+            "db_save_seconds": round(durations.get("db_save", 0.0), 3),
+        }
+        if "sync_attempt" in durations:
+            record["sync_seconds"] = round(durations["sync_attempt"], 1)
+        try:
+            record["db_bytes"] = db_path.stat().st_size
+        except OSError:
+            pass
+        self._append(record)
+        self._write_textfile(record)
+        return record
+
+    def _append(self, record: dict):
+        """追加一行；超过 METRICS_KEEP_RUNS 行时只保留最近的部分"""
+        try:
+            lines = load_metrics(self.log_path, METRICS_KEEP_RUNS - 1)
+            lines.append(record)
+            if len(lines) < METRICS_KEEP_RUNS:
+                with self.log_path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                return
+            tmp_path = self.log_path.with_name(self.log_path.name + ".tmp")
+            tmp_path.write_text(
+                "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in lines), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.log_path)
+        except Exception as e:
+            print(f"[WARN] 写入运行指标失败: {e}")
+
+    def _write_textfile(self, record: dict):
+        out = []
+        for field, metric, help_text in METRIC_FIELDS:
+            if field not in record:
+                continue
+            out.append(f"# TYPE {metric} gauge")
+            out.append(f"# HELP {metric} {help_text}")
+            out.append(f"{metric} {record[field]}")
+        out.append("# TYPE toutiao_last_run_timestamp_seconds gauge")
+        out.append(f"toutiao_last_run_timestamp_seconds {int(time.time())}")
+        out.append("# EOF")
+        # 先写临时文件再替换，避免采集器读到写了一半的文件
+        tmp_path = self.textfile.with_name(self.textfile.name + ".tmp")
+        try:
+            tmp_path.write_text("\n".join(out) + "\n", encoding="utf-8")
+            os.replace(tmp_path, self.textfile)
+        except Exception as e:
+            print(f"[WARN] 写入 {self.textfile.name} 失败: {e}")
+
+
+def load_metrics(path: Path = METRICS_LOG, last: int = None) -> list:
+    if not path.exists():
+        return []
+    records = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records[-last:] if last else records
+
+
+def print_metrics(last: int):
+    """打印最近 last 次运行的指标汇总 (均值/最小/最大/最近一次)"""
+    records = load_metrics(METRICS_LOG, last)
+    if not records:
+        print(f"[METRICS] 暂无运行记录: {METRICS_LOG}")
+        return
+    print(f"[METRICS] 最近 {len(records)} 次运行 ({records[0]['ts']} ~ {records[-1]['ts']})")
+    print(f"  {'指标':<18}{'次数':>6}{'均值':>12}{'最小':>12}{'最大':>12}{'最近':>12}")
+    for field, _, help_text in METRIC_FIELDS:
+        # 早期记录省略了为 0 的计数
+        if field in METRIC_COUNTERS:
+            values = [r.get(field, 0) for r in records]
+        else:
+            values = [r[field] for r in records if field in r]
+        if not values:
+            continue
+        print(f"  {field:<18}{len(values):>6}{sum(values) / len(values):>12.1f}"
+              f"{min(values):>12}{max(values):>12}{values[-1]:>12}")
+    reads = sum(r.get("reads_success", 0) + r.get("reads_failed", 0) for r in records)
+    if reads:
+        failed = sum(r.get("reads_failed", 0) for r in records)
+        print(f"[METRICS] 阅读失败率: {failed / reads:.1%} ({failed}/{reads})")
+
+
+RUN_METRICS = RunMetrics(METRICS_LOG, METRICS_TEXTFILE)
+
+
+# ================= 调试产物 =================
+
+def _infer_artifact_kind(name: str) -> str:
+    """按文件名推断旧版调试文件的类别 (只在首次建立索引时使用)"""
+    if name.startswith("error_read_"):
+        return "read_error"
+    if name.startswith("read_") and "_START" in name:
+        return "read_start"
+    if name.startswith("read_") and "_END" in name:
+        return "read_end"
+    if name.startswith("sync_success"):
+        return "sync_success"
+    if name.startswith(("captcha_sync", "error_sync_", "debug_sync_fail_", "before_refresh_", "sync_source_")):
+        return "sync_debug"
+    if name.startswith("captcha_"):
+        return "captcha"
+    return "other"
+
+
+class ArtifactStore:
+    """
+    调试产物 (截图、页面源码) 的存储。索引文件记录每个产物的名称、类别和大小，
+    按 ARTIFACT_KEEP 保留每类最新的若干个，并控制总字节数不超过预算；
+    清理只依据索引，不再扫描目录。
+    """
+
+    def __init__(self, root: Path, index_path: Path,
+                 budget: int = ARTIFACT_BUDGET_BYTES, keep: dict = None):
+        self.root = root
+        self.index_path = index_path
+        self.budget = budget
+        self.keep = ARTIFACT_KEEP if keep is None else keep
+        self.entries = self._load()
+        self._names = {e["name"] for e in self.entries}
+        # 挂上后台写盘器后，索引变更只标记为待写，由写盘器在线程池里写出
+        self._writer = None
+        self._dirty = False
+
+    def _load(self) -> list:
+        if self.index_path.exists():
+            try:
+                return json.loads(self.index_path.read_text(encoding="utf-8"))
+            except Exception as e:
+                print(f"[WARN] 读取产物索引失败: {e}，将重新建立")
+        # 首次建立索引：登记目录中已有的调试文件 (仅此一次扫描)
+        entries = []
+        for path in self.root.iterdir():
+            if path.suffix not in (".png", ".jpg", ".html") or path.name.startswith("read_report"):
+                continue
+            stat = path.stat()
+            entries.append({
+                "name": path.name,
+                "kind": _infer_artifact_kind(path.name),
+                "size": stat.st_size,
+                "ts": stat.st_mtime,
+            })
+        entries.sort(key=lambda e: e["ts"])
+        return entries
+
+    def _save(self):
+        if self._writer is not None:
+            self._dirty = True
+            return
+        self._write_index(self.entries)
+
+    def _write_index(self, entries):
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"[WARN] 保存产物索引失败: {e}")
+
+    def attach_writer(self, writer: BackgroundWriter, span: str = None):
+        self._writer = writer
+        writer.register(self._take_pending, span)
+
+    def _take_pending(self):
+        if not self._dirty:
+            return None
+        self._dirty = False
+        # 条目创建后不再修改，复制列表即可在线程池里安全序列化
+        entries = list(self.entries)
+        return lambda: self._write_index(entries)
+
+    def exists(self, name: str) -> bool:
+        return name in self._names
+
+    def _register(self, name: str, kind: str, size: int):
+        self.entries = [e for e in self.entries if e["name"] != name]
+        self.entries.append({"name": name, "kind": kind, "size": size, "ts": time.time()})
+        self._names.add(name)
+        self._prune()
+        self._save()
+
+    def _remove(self, doomed: list) -> int:
+        names = {e["name"] for e in doomed}
+        self.entries = [e for e in self.entries if e["name"] not in names]
+        self._names -= names
+        for name in names:
+            try:
+                (self.root / name).unlink(missing_ok=True)
+            except Exception:
+                pass
+        return len(names)
+
+    def _prune(self):
+        by_kind = {}
+        for entry in self.entries:
+            by_kind.setdefault(entry["kind"], []).append(entry)
+        doomed = []
+        for kind, items in by_kind.items():
+            keep = self.keep.get(kind)
+            if keep is not None and len(items) > keep:
+                doomed.extend(items[:len(items) - keep])
+        self._remove(doomed)
+
+        total = sum(e["size"] for e in self.entries)
+        doomed = []
+        # 超出预算时从最旧的开始删，最新的一个总是保留
+        for entry in self.entries[:-1]:
+            if total <= self.budget:
+                break
+            doomed.append(entry)
+            total -= entry["size"]
+        self._remove(doomed)
+
+    async def screenshot(self, page: Page, stem: str, kind: str, **kwargs) -> str:
+        """以 JPEG 保存截图并登记，返回文件路径；截图失败时异常照常抛出"""
+        name = f"{stem}.jpg"
+        path = self.root / name
+        with TRACER.span("screenshot", kind=kind):
+            await page.screenshot(path=path, type="jpeg", quality=SCREENSHOT_QUALITY, **kwargs)
+        self._register(name, kind, path.stat().st_size)
+        return str(path)
+
+    def write_text(self, name: str, kind: str, content: str) -> str:
+        path = self.root / name
+        path.write_text(content, encoding="utf-8")
+        self._register(name, kind, path.stat().st_size)
+        return str(path)
+
+    def discard(self, *kinds) -> int:
+        """删除指定类别的全部产物，返回删除个数"""
+        removed = self._remove([e for e in self.entries if e["kind"] in kinds])
+        if removed:
+            self._save()
+        return removed
+
+
+ARTIFACTS = ArtifactStore(DEBUG_DIR, ARTIFACT_INDEX)
+
+
 # ================= HTML 报告 =================
 
-def _ensure_report():
-    """确保报告文件存在且有完整 HTML 框架"""
-    if not REPORT_FILE.exists():
-        REPORT_FILE.write_text("""\
+REPORT_PAGE_HEAD = """\
 <!DOCTYPE html>
 <html>
 <head>
 <meta charset="utf-8">
-<title>头条阅读 Debug 报告</title>
+<title>{title}</title>
 <style>
   body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
          font-size: 13px; padding: 24px; background: #f5f5f5; color: #333; }
@@ -242,9 +1055,19 @@ function openImg(src){
 </script>
 </head>
 <body>
-<h2>📋 头条阅读 Debug 报告</h2>
-<p class="meta">文件位置: data/debug/read_report.html &nbsp;|&nbsp; 点击缩略图可放大查看</p>
+<h2>📋 {title}</h2>
+<p class="meta">{meta}</p>
 <table>
+"""
+
+REPORT_PAGE_TAIL = """\
+</tbody>
+</table>
+</body>
+</html>
+"""
+
+REPORT_ROWS_HEAD = """\
 <thead><tr>
   <th>时间</th>
   <th>文章链接</th>
@@ -254,40 +1077,51 @@ function openImg(src){
   <th>截图</th>
 </tr></thead>
 <tbody>
-<!-- ROWS -->
-</tbody>
-</table>
-</body>
-</html>
-""", encoding="utf-8")
+"""
+
+REPORT_STATUSES = {
+    "success": ("tag-success", "✅ 成功"),
+    "failed":  ("tag-failed",  "❌ 失败"),
+    "invalid": ("tag-invalid", "⚠️ 失效"),
+    "captcha": ("tag-captcha", "🔒 验证码"),
+}
+
+
+REPORT_EVENTS = JsonlLog(REPORT_LOG)
+
+
+def _report_head(title: str, meta: str) -> str:
+    return REPORT_PAGE_HEAD.replace("{title}", title).replace("{meta}", meta)
 
 
 def append_report(article_url: str, title: str, ss_path: str, status: str, note: str = ""):
     """
-    向 HTML 报告追加一行：可点击的文章链接 + 状态标签 + 缩略截图。
+    向报告事件日志追加一行 (JSONL)，HTML 由 render_report() 统一生成。
     ss_path 传空字符串表示无截图。
     """
-    _ensure_report()
-
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    tag_class = {
-        "success": "tag-success",
-        "failed":  "tag-failed",
-        "invalid": "tag-invalid",
-        "captcha": "tag-captcha",
-    }.get(status, "tag-failed")
-
-    status_label = {
-        "success": "✅ 成功",
-        "failed":  "❌ 失败",
-        "invalid": "⚠️ 失效",
-        "captcha": "🔒 验证码",
-    }.get(status, status)
-
-    # 截图使用同目录下的文件名（相对路径），方便浏览器直接加载
-    if ss_path:
-        img_name = Path(ss_path).name
+    RUN_METRICS.inc(f"reads_{status}")
+    with TRACER.span("report_append", status=status):
+        event = {
+            "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "url": article_url,
+            "title": (title or "")[:50],
+            "status": status,
+            "note": (note or "")[:100],
+            # 截图使用同目录下的文件名（相对路径），方便浏览器直接加载
+            "screenshot": Path(ss_path).name if ss_path else "",
+        }
+        REPORT_EVENTS.append(event)
+
+
+def _render_row(event: dict) -> str:
+    """把一条报告事件渲染成表格行：可点击的文章链接 + 状态标签 + 缩略截图"""
+    status = event.get("status", "")
+    tag_class, status_label = REPORT_STATUSES.get(status, ("tag-failed", status))
+
+    img_name = event.get("screenshot", "")
+    if img_name and not ARTIFACTS.exists(img_name):
+        img_html = "<span style='color:#ccc'>已清理</span>"
+    elif img_name:
         img_html = (
             f'<img class="thumb" src="{img_name}" '
             f'onclick="openImg(\'{img_name}\')" '
@@ -296,13 +1130,13 @@ def append_report(article_url: str, title: str, ss_path: str, status: str, note:
     else:
         img_html = "<span style='color:#ccc'>—</span>"
 
-    # 标题截断，防止列过宽
-    title_safe = (title or "")[:50].replace("<", "&lt;").replace(">", "&gt;")
-    note_safe  = (note  or "")[:100].replace("<", "&lt;").replace(">", "&gt;")
+    article_url = event.get("url", "")
+    title_safe = event.get("title", "").replace("<", "&lt;").replace(">", "&gt;")
+    note_safe  = event.get("note", "").replace("<", "&lt;").replace(">", "&gt;")
 
-    row = (
+    return (
         f"<tr>"
-        f"<td style='white-space:nowrap;color:#888'>{timestamp}</td>"
+        f"<td style='white-space:nowrap;color:#888'>{event.get('ts', '')}</td>"
         f"<td><a href='{article_url}' target='_blank'>{article_url}</a></td>"
         f"<td title='{title_safe}'>{title_safe}</td>"
         f"<td><span class='tag {tag_class}'>{status_label}</span></td>"
@@ -311,120 +1145,1133 @@ def append_report(article_url: str, title: str, ss_path: str, status: str, note:
         f"</tr>\n"
     )
 
-    content = REPORT_FILE.read_text(encoding="utf-8")
-    content = content.replace("<!-- ROWS -->", row + "<!-- ROWS -->")
-    REPORT_FILE.write_text(content, encoding="utf-8")
+
+def render_report():
+    """
+    单次流式读取报告事件日志，按日期分页生成 HTML：
+    每天一个 read_report_YYYY-MM-DD.html，REPORT_FILE 只是各日期页的索引。
+    """
+    # 旧版报告 (行直接写在 HTML 里) 改名保留，并在索引页中链接
+    legacy_file = DEBUG_DIR / "read_report_legacy.html"
+    if REPORT_FILE.exists() and not legacy_file.exists():
+        try:
+            with REPORT_FILE.open(encoding="utf-8") as f:
+                is_legacy = any("<!-- ROWS -->" in line for line in f)
+            if is_legacy:
+                REPORT_FILE.replace(legacy_file)
+        except Exception as e:
+            print(f"[WARN] 迁移旧报告失败: {e}")
+
+    days = {}
+    page = None
+    current_day = None
+    try:
+        if REPORT_LOG.exists():
+            with REPORT_LOG.open(encoding="utf-8") as log:
+                for line in log:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    day = event.get("ts", "")[:10]
+                    if day != current_day:
+                        if page:
+                            page.write(REPORT_PAGE_TAIL)
+                            page.close()
+                        current_day = day
+                        # 日志按时间追加，同一天的行是连续的
+                        page = REPORT_FILE.with_name(f"read_report_{day}.html").open("w", encoding="utf-8")
+                        page.write(_report_head(
+                            f"头条阅读 Debug 报告 {day}",
+                            "<a href='read_report.html'>← 返回索引</a> &nbsp;|&nbsp; 点击缩略图可放大查看"
+                        ))
+                        page.write(REPORT_ROWS_HEAD)
+                        days[day] = {}
+                    counts = days[day]
+                    status = event.get("status", "")
+                    counts[status] = counts.get(status, 0) + 1
+                    page.write(_render_row(event))
+    finally:
+        if page:
+            page.write(REPORT_PAGE_TAIL)
+            page.close()
+
+    with REPORT_FILE.open("w", encoding="utf-8") as index:
+        index.write(_report_head(
+            "头条阅读 Debug 报告",
+            f"事件日志: {REPORT_LOG.as_posix()} &nbsp;|&nbsp; 共 {len(days)} 天"
+        ))
+        index.write("<thead><tr><th>日期</th><th>篇数</th><th>状态</th></tr></thead>\n<tbody>\n")
+        for day in sorted(days, reverse=True):
+            counts = days[day]
+            tags = " ".join(
+                f"<span class='tag {REPORT_STATUSES.get(key, ('tag-failed', key))[0]}'>"
+                f"{REPORT_STATUSES.get(key, ('', key))[1]} {n}</span>"
+                for key, n in counts.items()
+            )
+            index.write(
+                f"<tr><td><a href='read_report_{day}.html'>{day}</a></td>"
+                f"<td>{sum(counts.values())}</td><td>{tags}</td></tr>\n"
+            )
+        if legacy_file.exists():
+            index.write("<tr><td><a href='read_report_legacy.html'>旧版报告</a></td><td></td><td></td></tr>\n")
+        index.write(REPORT_PAGE_TAIL)
+    print(f"[REPORT] 已生成报告: {len(days)} 个日期页 -> {REPORT_FILE}")
 
 
 # ================= 数据库管理类 =================
 
+# 权重档：(已读次数上限(不含), 权重)，上限为 None 表示兜底档
+WEIGHT_TIERS = (
+    (1, 200),
+    (5, 100),
+    (20, 50),
+    (AGING_THRESHOLD, 20),
+    (None, 5),
+)
+TIER_WEIGHTS = [w for _, w in WEIGHT_TIERS]
+
+
+def read_tier(read_count: int) -> int:
+    """按已读次数返回权重档下标：读得越少越优先"""
+    for tier, (upper, _) in enumerate(WEIGHT_TIERS):
+        if upper is None or read_count < upper:
+            return tier
+    return len(WEIGHT_TIERS) - 1
+
+
+def read_weight(read_count: int) -> int:
+    return TIER_WEIGHTS[read_tier(read_count)]
+
+
+def sample_tiers(tier_sizes: list, tier_weights: list, k: int) -> list:
+    """
+    按档位做不放回加权抽样，返回 [(档位下标, 档内位置), ...]。
+    同档内每篇权重相同，所以"先按 剩余篇数×权重 选档、再在档内均匀抽一篇"
+    与逐篇按权重不放回抽样的分布完全一致。
+    档内用稀疏 Fisher-Yates 交换表避免复制列表，总开销 O(档位数·k)。
+    """
+    remaining = list(tier_sizes)
+    swaps = [{} for _ in tier_sizes]
+    picks = []
+    for _ in range(k):
+        total = sum(n * w for n, w in zip(remaining, tier_weights))
+        if total <= 0:
+            break
+        r = random.random() * total
+        tier = 0
+        for tier, (n, w) in enumerate(zip(remaining, tier_weights)):
+            r -= n * w
+            if r < 0 and n:
+                break
+        while not remaining[tier]:
+            tier -= 1
+        n = remaining[tier]
+        j = random.randrange(n)
+        swap = swaps[tier]
+        picks.append((tier, swap.get(j, j)))
+        swap[j] = swap.get(n - 1, n - 1)
+        remaining[tier] = n - 1
+    return picks
+
+
+def plan_picks(tier_sizes: list) -> list:
+    """决定今日阅读篇数，并在各权重档上抽样"""
+    total = sum(tier_sizes)
+    if not total:
+        return []
+
+    target_k = random.randint(MIN_READ_COUNT, MAX_READ_COUNT)
+    target_k = min(target_k, total)
+    print(f"[PLAN] 可选文章库: {total} 篇. 计划阅读: {target_k} 篇")
+    return sample_tiers(tier_sizes, TIER_WEIGHTS, target_k)
+
+
+def format_tier_sizes(sizes: dict) -> str:
+    parts = [f"w{w}×{sizes[w]}" for w in TIER_WEIGHTS]
+    return " ".join(parts) + f" | 今日已读 {sizes['read_today']}"
+
+
+class TierIndex:
+    """
+    活跃文章按权重档分桶的内存索引，另有一个"今日已读"桶。
+    每个桶是 列表 + 位置表，增删都是 O(1)，也能按位置直接取值。
+    """
+
+    def __init__(self, day: str = ""):
+        self.day = day
+        self._buckets = [[] for _ in WEIGHT_TIERS]
+        self._read_today = set()
+        self._where = {}
+
+    def place(self, entry):
+        """按文章当前状态放入对应桶 (失效文章从索引中移除)"""
+        self.remove(entry)
+        if entry.get("status") != "active":
+            return
+        if entry.get("last_read_at") == self.day:
+            self._read_today.add(id(entry))
+            return
+        bucket = self._buckets[read_tier(entry.get("read_count", 0))]
+        self._where[id(entry)] = (bucket, len(bucket))
+        bucket.append(entry)
+
+    def remove(self, entry):
+        # 文章条目对象常驻在库里，直接以对象身份作为索引键
+        self._read_today.discard(id(entry))
+        slot = self._where.pop(id(entry), None)
+        if slot is None:
+            return
+        bucket, pos = slot
+        last = bucket.pop()
+        if last is not entry:
+            bucket[pos] = last
+            self._where[id(last)] = (bucket, pos)
+
+    def tier_sizes(self) -> list:
+        return [len(bucket) for bucket in self._buckets]
+
+    def entry_at(self, tier, pos):
+        return self._buckets[tier][pos]
+
+    def sizes(self) -> dict:
+        sizes = dict(zip(TIER_WEIGHTS, self.tier_sizes()))
+        sizes["read_today"] = len(self._read_today)
+        return sizes
+
+
+# ---------- 紧凑内存表示 ----------
+
+ARTICLE_URL_RE = re.compile(r"^https://www\.toutiao\.com/(article|w|video)/(\d+)/$")
+ARTICLE_KINDS = ("article", "w", "video")
+STATUS_NAMES = ["active", "invalid"]
+
+
+def parse_article_url(url: str):
+    """标准文章链接返回 (类型码, 数字 id)，其它链接返回 None"""
+    m = ARTICLE_URL_RE.match(url)
+    if not m:
+        return None
+    return ARTICLE_KINDS.index(m.group(1)), int(m.group(2))
+
+
+def _status_code(name: str) -> int:
+    try:
+        return STATUS_NAMES.index(name)
+    except ValueError:
+        STATUS_NAMES.append(name)
+        return len(STATUS_NAMES) - 1
+
+
+@lru_cache(maxsize=4096)
+def _date_to_ordinal(day: str) -> int:
+    return date.fromisoformat(day).toordinal() if day else 0
+
+
+@lru_cache(maxsize=4096)
+def _ordinal_to_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat() if ordinal else ""
+
+
+class ArticleRecord:
+    """
+    单篇文章的紧凑记录。对外仍按 dict 的方式读写 title/url/status/last_read_at/read_count，
+    内部状态存为小整数码、日期存为序数，URL 由类型码 + 数字 id 还原。
+    """
+
+    __slots__ = ("aid", "kind", "title", "status", "last_read", "read_count", "raw_url")
+    FIELDS = ("title", "url", "status", "last_read_at", "read_count")
+
+    def __init__(self, aid: int, kind: int, raw_url, entry):
+        self.aid = aid
+        self.kind = kind
+        self.raw_url = raw_url
+        self.title = entry.get("title", "")
+        self.status = _status_code(entry.get("status", "active"))
+        self.last_read = _date_to_ordinal(entry.get("last_read_at", ""))
+        self.read_count = entry.get("read_count", 0)
+
+    @property
+    def url(self) -> str:
+        if self.raw_url is not None:
+            return self.raw_url
+        return f"https://www.toutiao.com/{ARTICLE_KINDS[self.kind]}/{self.aid}/"
+
+    def __getitem__(self, key):
+        if key == "title":
+            return self.title
+        if key == "url":
+            return self.url
+        if key == "status":
+            return STATUS_NAMES[self.status]
+        if key == "last_read_at":
+            return _ordinal_to_date(self.last_read)
+        if key == "read_count":
+            return self.read_count
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "title":
+            self.title = value
+        elif key == "status":
+            self.status = _status_code(value)
+        elif key == "last_read_at":
+            self.last_read = _date_to_ordinal(value)
+        elif key == "read_count":
+            self.read_count = value
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.FIELDS
+
+    def items(self):
+        return [(key, self[key]) for key in self.FIELDS]
+
+    def copy(self):
+        clone = ArticleRecord.__new__(ArticleRecord)
+        for slot in self.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
+
+
+class CompactArticles(MutableMapping):
+    """
+    以 URL 为键的文章表，内部按 (数字 id, 类型码) 合成的整数键存放 ArticleRecord；
+    无法解析出数字 id 的链接放在按 URL 索引的兜底表里。
+    """
+
+    def __init__(self, entries=None):
+        self._by_id = {}
+        self._other = {}
+        if entries:
+            for url, entry in entries.items():
+                self[url] = entry
+
+    @staticmethod
+    def _key(url):
+        parsed = parse_article_url(url)
+        if parsed is None:
+            return None
+        kind, aid = parsed
+        return (aid << 2) | kind
+
+    def __getitem__(self, url):
+        key = self._key(url)
+        if key is None:
+            return self._other[url]
+        return self._by_id[key]
+
+    @staticmethod
+    def make_record(url, entry) -> ArticleRecord:
+        parsed = parse_article_url(url)
+        if parsed is None:
+            return ArticleRecord(0, 0, url, entry)
+        kind, aid = parsed
+        return ArticleRecord(aid, kind, None, entry)
+
+    def __setitem__(self, url, entry):
+        record = entry if isinstance(entry, ArticleRecord) else self.make_record(url, entry)
+        if record.raw_url is not None:
+            self._other[url] = record
+        else:
+            self._by_id[(record.aid << 2) | record.kind] = record
+
+    def __delitem__(self, url):
+        key = self._key(url)
+        if key is None:
+            del self._other[url]
+        else:
+            del self._by_id[key]
+
+    def __contains__(self, url):
+        key = self._key(url)
+        return url in self._other if key is None else key in self._by_id
+
+    def __iter__(self):
+        for record in self._by_id.values():
+            yield record.url
+        yield from self._other
+
+    def __len__(self):
+        return len(self._by_id) + len(self._other)
+
+    def values(self):
+        yield from self._by_id.values()
+        yield from self._other.values()
+
+    def items(self):
+        for record in self.values():
+            yield record.url, record
+
+    def copy(self):
+        clone = CompactArticles()
+        clone._by_id = {key: record.copy() for key, record in self._by_id.items()}
+        clone._other = {url: record.copy() for url, record in self._other.items()}
+        return clone
+
+
+def _compact_hook(obj: dict):
+    if "url" in obj and "read_count" in obj:
+        return CompactArticles.make_record(obj["url"], obj)
+    return obj
+
+
+def _json_default(obj):
+    if isinstance(obj, CompactArticles):
+        return dict(obj.items())
+    if isinstance(obj, ArticleRecord):
+        return dict(obj.items())
+    raise TypeError(f"无法序列化 {type(obj).__name__}")
+
+
+LINES_FORMAT = "toutiao-db-lines"
+
+
 class ArticleDB:
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, mode: str = DB_STORAGE_MODE, compact: bool = COMPACT_RECORDS,
+                 read_only: bool = False):
         self.db_path = db_path
+        self.mode = mode
+        # 只读打开 (stats / plan 预览、导入 SQLite)：不迁移、不压缩，变更只留在内存
+        self.read_only = read_only
+        self.compact_records = compact
+        self.fmt = "lines" if db_path.suffix == ".jsonl" else "json"
+        self.journal_path = self._journal_for(db_path)
+        self._journal_lines = 0
+        self._writer = None
+        self._pending = []
+        # 后台写出失败后置位，下一次写盘改为整库保存，补上丢失的变更
+        self._resave = False
+        # 重放时发现损坏行后记下最后一条完好记录的结束位置，打开后立即修复
+        self._journal_good_end = None
+        self._legacy_path = None
         self.data = self._load()
+        self._rebuild_index()
+        if self.read_only:
+            return
+        if self._legacy_path is not None:
+            self._migrate_legacy()
+        # 非日志模式下遗留的日志已重放进内存，立即落成快照
+        elif self.mode != "journal" and self._journal_lines:
+            self.compact()
+        elif self._journal_good_end is not None:
+            self._repair_journal()
+
+    @staticmethod
+    def _journal_for(path: Path) -> Path:
+        return path.with_name(path.name + ".journal")
+
+    def _rebuild_index(self):
+        self._index = TierIndex(datetime.now().strftime("%Y-%m-%d"))
+        for entry in self.data["articles"].values():
+            self._index.place(entry)
 
     def _load(self):
-        if not self.db_path.exists():
-            return {"last_sync_date": "", "articles": {}}
+        source = self.db_path
+        legacy = self.db_path.with_suffix(".json")
+        if not source.exists() and self.fmt == "lines" and legacy.exists():
+            source = self._legacy_path = legacy
+        data = self._load_snapshot(source, self.compact_records)
+        self._replay_journal(data, self._journal_for(source))
+        return data
+
+    @staticmethod
+    def _load_snapshot(path: Path, compact: bool = False):
+        """按首行自动识别格式：行格式首行是带 format 字段的元数据，否则按整份 JSON 解析"""
+        empty = {"last_sync_date": "", "articles": CompactArticles() if compact else {}}
+        if not path.exists():
+            return empty
         try:
-            return json.loads(self.db_path.read_text(encoding="utf-8"))
+            with path.open(encoding="utf-8") as f:
+                first = f.readline()
+                try:
+                    header = json.loads(first)
+                except ValueError:
+                    header = None
+                if not isinstance(header, dict) or header.get("format") != LINES_FORMAT:
+                    text = first + f.read()
+                    if not compact:
+                        return json.loads(text)
+                    # 解析时直接把文章条目建成紧凑记录，不保留整库 dict 的中间态
+                    data = json.loads(text, object_hook=_compact_hook)
+                    data["articles"] = CompactArticles(data["articles"])
+                    return data
+                data = {k: v for k, v in header.items() if k not in ("format", "version")}
+                articles = data["articles"] = CompactArticles() if compact else {}
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        articles[entry["url"]] = entry
+                return data
         except Exception as e:
             print(f"[DB] 读取数据库出错: {e}，将初始化新库")
-            return {"last_sync_date": "", "articles": {}}
+            return empty
+
+    @staticmethod
+    def _dump_lines(data) -> str:
+        header = {"format": LINES_FORMAT, "version": 1}
+        header.update((k, v) for k, v in data.items() if k != "articles")
+        lines = [json.dumps(header, ensure_ascii=False)]
+        articles = data["articles"]
+        for url, entry in sorted(articles.items(), key=lambda item: item[0]):
+            row = {"url": url}
+            row.update((k, v) for k, v in entry.items() if k != "url")
+            lines.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+        return "\n".join(lines) + "\n"
+
+    def _migrate_legacy(self):
+        """旧 JSON 库 (及其变更日志) 已读入内存：写成新格式后删除旧文件"""
+        legacy = self._legacy_path
+        if not self.save():
+            return
+        try:
+            legacy.unlink(missing_ok=True)
+            self._journal_for(legacy).unlink(missing_ok=True)
+            self._journal_lines = 0
+            self._legacy_path = None
+            print(f"[DB] 已将 {legacy.name} 迁移为 {self.db_path.name}")
+        except Exception as e:
+            print(f"[DB] 清理旧数据库文件失败: {e}")
+
+    def _replay_journal(self, data, journal_path: Path):
+        """
+        按顺序重放变更日志。崩溃时写了一半的行 (或被下一次运行接在其后的行) 跳过，
+        不影响其后的记录；有损坏时记下最后一条完好记录的结束位置，由 _repair_journal 修复。
+        """
+        if not journal_path.exists():
+            return
+        replayed = 0
+        skipped = 0
+        good_end = 0
+        unterminated = False
+        try:
+            with journal_path.open("rb") as f:
+                for raw in f:
+                    line = raw.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    # 末行完整但缺换行时，下一次追加会与它粘成一行
+                    unterminated = not raw.endswith(b"\n")
+                    self._apply(data, record)
+                    replayed += 1
+                    good_end = f.tell()
+        except Exception as e:
+            print(f"[DB] 读取变更日志出错: {e}")
+        self._journal_lines = replayed
+        if skipped:
+            print(f"[DB] 变更日志中有 {skipped} 行不完整，已跳过")
+        if skipped or unterminated:
+            self._journal_good_end = good_end
+        if replayed:
+            print(f"[DB] 已重放 {replayed} 条变更日志")
+
+    def _repair_journal(self):
+        """日志有损坏行时立即落成快照；快照失败则截断到最后一条完好记录，避免新记录接在半行之后"""
+        if self._compact_to(self.data):
+            print("[DB] 已将损坏的变更日志合并为快照")
+        else:
+            try:
+                with self.journal_path.open("r+b") as f:
+                    f.truncate(self._journal_good_end)
+                    if self._journal_good_end:
+                        f.seek(self._journal_good_end - 1)
+                        if f.read(1) != b"\n":
+                            f.write(b"\n")
+                print("[DB] 已截断变更日志末尾的损坏记录")
+            except Exception as e:
+                print(f"[DB] 修复变更日志失败: {e}")
+        self._journal_good_end = None
+
+    @staticmethod
+    def _apply(data, record):
+        """
+        把一条变更记录应用到内存数据上。
+        记录中保存的都是变更后的结果值，重复重放也不会改变结果。
+        返回新增文章数 (仅 add 记录有意义)。
+        """
+        op = record["op"]
+        articles = data["articles"]
+        if op == "add":
+            added_count = 0
+            for item in record["items"]:
+                url = item['href']
+                if url not in articles:
+                    articles[url] = {
+                        "title": item['text'],
+                        "url": url,
+                        "status": "active",
+                        "last_read_at": "",
+                        "read_count": 0
+                    }
+                    added_count += 1
+                elif articles[url]["title"] == "Untitled" and item['text'] != "Untitled":
+                    articles[url]["title"] = item['text']
+            return added_count
+        if op == "read":
+            entry = articles.get(record["url"])
+            if entry is not None:
+                entry["last_read_at"] = record["date"]
+                entry["read_count"] = record["read_count"]
+        elif op == "invalid":
+            entry = articles.get(record["url"])
+            if entry is not None:
+                entry["status"] = "invalid"
+        elif op == "synced":
+            data["last_sync_date"] = record["date"]
+        return 0
+
+    def _commit(self, record):
+        """
+        持久化一条已应用的变更：日志模式追加一行，快照模式整库重写。
+        挂上后台写盘器后只入队，由 _take_pending 合并写出。
+        """
+        if self.read_only:
+            return
+        if self._writer is not None:
+            self._pending.append(record)
+            return
+        if self.mode != "journal":
+            self.save()
+            return
+        if not self._append_journal([record]):
+            print("[DB] 改为整库保存")
+            self.compact()
+            return
+        if self._journal_lines >= JOURNAL_COMPACT_EVERY:
+            self.compact()
 
-    def save(self):
+    def _append_journal(self, records) -> bool:
         try:
-            self.db_path.write_text(
-                json.dumps(self.data, indent=2, ensure_ascii=False),
-                encoding="utf-8"
-            )
+            with self.journal_path.open("a", encoding="utf-8") as f:
+                f.write("".join(
+                    json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n"
+                    for r in records
+                ))
+            self._journal_lines += len(records)
+            return True
+        except Exception as e:
+            print(f"[DB] 写入变更日志失败: {e}")
+            return False
+
+    def _write_snapshot(self, data) -> bool:
+        """整库写入临时文件后原子替换，崩溃时不会留下写了一半的数据库"""
+        tmp_path = self.db_path.with_name(self.db_path.name + ".tmp")
+        try:
+            if self.fmt == "lines":
+                content = self._dump_lines(data)
+            else:
+                content = json.dumps(data, indent=2, ensure_ascii=False, default=_json_default)
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, self.db_path)
+            return True
         except Exception as e:
             print(f"[DB] 保存失败: {e}")
+            return False
+
+    def _compact_to(self, data) -> bool:
+        if not self._write_snapshot(data):
+            return False
+        try:
+            self.journal_path.unlink(missing_ok=True)
+            self._journal_lines = 0
+        except Exception as e:
+            print(f"[DB] 清理变更日志失败: {e}")
+        return True
+
+    def _snapshot(self):
+        """在事件循环线程里复制一份数据，供线程池写盘时使用"""
+        data = dict(self.data)
+        articles = self.data["articles"]
+        if isinstance(articles, CompactArticles):
+            data["articles"] = articles.copy()
+        else:
+            data["articles"] = {url: dict(entry) for url, entry in articles.items()}
+        return data
+
+    def save(self) -> bool:
+        return self._write_snapshot(self.data)
+
+    def compact(self):
+        """把当前状态落成快照并清空变更日志"""
+        self._compact_to(self.data)
+
+    def attach_writer(self, writer):
+        """之后的变更只标记为待写，由后台写盘器合并落盘"""
+        self._writer = writer
+        writer.register(self._take_pending, "db_save")
+
+    def _take_pending(self):
+        if not self._pending and not self._resave:
+            return None
+        records, self._pending = self._pending, []
+        if (self.mode == "journal" and not self._resave
+                and self._journal_lines + len(records) < JOURNAL_COMPACT_EVERY):
+            return lambda: self._write_pending(self._append_journal, records)
+        self._resave = False
+        snapshot = self._snapshot()
+        if self.mode == "journal":
+            return lambda: self._write_pending(self._compact_to, snapshot)
+        return lambda: self._write_pending(self._write_snapshot, snapshot)
+
+    def _write_pending(self, write, arg):
+        """在线程池里执行；失败时与 _commit 一样改为整库保存，由下一次写盘或 close 补上"""
+        if not write(arg):
+            print("[DB] 改为整库保存")
+            self._resave = True
+
+    async def flush(self):
+        """等待所有待写变更落盘 (未挂写盘器时变更已同步落盘)"""
+        if self._writer is not None:
+            await self._writer.flush()
+
+    def last_sync_date(self) -> str:
+        return self.data.get("last_sync_date", "")
 
     def needs_sync(self) -> bool:
         today = datetime.now().strftime("%Y-%m-%d")
-        return self.data.get("last_sync_date") != today
+        return self.last_sync_date() != today
 
     def mark_synced(self):
-        self.data["last_sync_date"] = datetime.now().strftime("%Y-%m-%d")
-        self.save()
+        record = {"op": "synced", "date": datetime.now().strftime("%Y-%m-%d")}
+        self._apply(self.data, record)
+        self._commit(record)
 
     def add_articles(self, scraped_items: list):
-        added_count = 0
         current_urls = self.data["articles"]
-        for item in scraped_items:
-            url = item['href']
-            if url not in current_urls:
-                current_urls[url] = {
-                    "title": item['text'],
-                    "url": url,
-                    "status": "active",
-                    "last_read_at": "",
-                    "read_count": 0
-                }
-                added_count += 1
-            elif current_urls[url]["title"] == "Untitled" and item['text'] != "Untitled":
-                current_urls[url]["title"] = item['text']
+        # 只记录真正会改变库内容的条目（新文章或补全 Untitled 标题）
+        changed = [
+            {"href": item['href'], "text": item['text']}
+            for item in scraped_items
+            if item['href'] not in current_urls
+            or (current_urls[item['href']]["title"] == "Untitled" and item['text'] != "Untitled")
+        ]
+        record = {"op": "add", "items": changed}
+        added_count = self._apply(self.data, record)
+        for item in changed:
+            self._index.place(current_urls[item['href']])
         print(f"[DB] 数据库更新: 新增 {added_count} 篇，当前总库存 {len(current_urls)} 篇")
-        self.save()
+        if changed or self.mode != "journal":
+            self._commit(record)
 
     def mark_invalid(self, url):
         if url in self.data["articles"]:
-            self.data["articles"][url]["status"] = "invalid"
+            record = {"op": "invalid", "url": url}
+            self._apply(self.data, record)
+            self._index.remove(self.data["articles"][url])
             print(f"[DB] 链接标记为无效: {url}")
-            self.save()
+            self._commit(record)
 
     def record_read(self, url):
         if url in self.data["articles"]:
-            today = datetime.now().strftime("%Y-%m-%d")
             entry = self.data["articles"][url]
-            entry["last_read_at"] = today
-            entry["read_count"] = entry.get("read_count", 0) + 1
-            self.save()
+            record = {
+                "op": "read",
+                "url": url,
+                "date": datetime.now().strftime("%Y-%m-%d"),
+                "read_count": entry.get("read_count", 0) + 1,
+            }
+            self._apply(self.data, record)
+            self._index.place(entry)
+            self._commit(record)
+
+    def article_count(self) -> int:
+        return len(self.data["articles"])
+
+    def has_article(self, url) -> bool:
+        return url in self.data["articles"]
+
+    def close(self):
+        """写出尚未落盘的变更 (正常情况下写盘器停止时已全部写出)"""
+        job = self._take_pending()
+        if job is not None:
+            job()
+
+    def tier_sizes(self) -> dict:
+        """各权重档的候选篇数与今日已读篇数，供诊断使用"""
+        if self._index.day != datetime.now().strftime("%Y-%m-%d"):
+            self._rebuild_index()
+        return self._index.sizes()
 
     def get_weighted_candidates(self) -> list:
+        print(f"[PLAN] 权重分桶: {format_tier_sizes(self.tier_sizes())}")
+        picks = plan_picks(self._index.tier_sizes())
+        return [self._index.entry_at(tier, pos) for tier, pos in picks]
+
+    def iter_articles(self):
+        """按 ARTICLE_FIELDS 逐篇返回文章，供导出与统计使用"""
+        for url, entry in self.data["articles"].items():
+            yield {
+                "url": url,
+                "title": entry.get("title", ""),
+                "status": entry.get("status", "active"),
+                "last_read_at": entry.get("last_read_at", ""),
+                "read_count": entry.get("read_count", 0),
+            }
+
+
+class SQLiteArticleDB:
+    """
+    基于标准库 sqlite3 的文章库，公开方法与 ArticleDB 一致。
+    候选查询与单条变更都走索引，不再随整库大小线性增长。
+
+    tier_slots 是 TierIndex 的持久化版本：活跃文章按权重档编号为 0..n-1 的连续位置，
+    今日已读的放在 READ_TODAY_TIER 档。按 (档, 位置) 主键直接取第 pos 篇，
+    各档篇数就是最大位置 + 1，都不需要扫描或排序整档。
+    """
+
+    READ_TODAY_TIER = -1
+    SLOTS_VERSION = "1"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            url          TEXT PRIMARY KEY,
+            title        TEXT NOT NULL,
+            status       TEXT NOT NULL DEFAULT 'active',
+            last_read_at TEXT NOT NULL DEFAULT '',
+            read_count   INTEGER NOT NULL DEFAULT 0
+        );
+        DROP INDEX IF EXISTS idx_articles_plan;
+        DROP INDEX IF EXISTS idx_articles_tier;
+        CREATE TABLE IF NOT EXISTS tier_slots (
+            tier INTEGER NOT NULL,
+            pos  INTEGER NOT NULL,
+            url  TEXT NOT NULL UNIQUE,
+            PRIMARY KEY (tier, pos)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS meta (
+            key   TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Path, import_from: Path = None, read_only: bool = False):
+        self.db_path = db_path
+        self.read_only = read_only
+        is_new = not db_path.exists()
+        if read_only:
+            # 只读打开：复制到内存库，建表、重建分档或导入都只发生在副本上，不改动磁盘文件
+            self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+            if not is_new:
+                # 没有 -wal 文件说明库已合并且无人在写，按不可变文件打开，
+                # 避免只读连接在目录里留下无法清理的 -wal / -shm
+                wal = db_path.with_name(db_path.name + "-wal")
+                flags = "mode=ro" if wal.exists() else "immutable=1"
+                source = sqlite3.connect(f"{db_path.resolve().as_uri()}?{flags}", uri=True)
+                try:
+                    source.backup(self.conn)
+                finally:
+                    source.close()
+        else:
+            # 后台写盘器会在线程池里执行写操作，连接访问统一由 _lock 串行化
+            self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+        # 事件循环线程上的热点读 (has_article) 用独立的只读连接，
+        # WAL 下不会被线程池里进行中的写事务阻塞，也不必等 _lock
+        if read_only:
+            self._reader = self.conn
+        else:
+            self._reader = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        self._writer = None
+        self._pending = []
+        # 已入队但尚未提交的新链接，提交后才对只读连接可见
+        self._pending_urls = set()
+        if is_new and import_from is not None and import_from.exists():
+            self.import_json(import_from)
+        if self._get_meta("tier_slots") != self.SLOTS_VERSION:
+            self._rebuild_slots()
+
+    def import_json(self, json_path: Path):
+        """一次性从现有 JSON 库 (含未压缩的变更日志) 导入"""
+        source = ArticleDB(json_path, mode="journal", read_only=True)
+        rows = [
+            (url, info.get("title", ""), info.get("status", "active"),
+             info.get("last_read_at", ""), info.get("read_count", 0))
+            for url, info in source.data["articles"].items()
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO articles "
+                "(url, title, status, last_read_at, read_count) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._set_meta("last_sync_date", source.data.get("last_sync_date", ""))
+            # 导入绕过了分档维护，下次打开或随后立即重建
+            self.conn.execute("DELETE FROM meta WHERE key = 'tier_slots'")
+        target = "内存 (只读打开)" if self.read_only else self.db_path
+        print(f"[DB] 已从 {json_path} 导入 {len(rows)} 篇文章到 {target}")
+
+    def _rebuild_slots(self):
+        """按 articles 全量重建 tier_slots (新库、导入或升级旧库时执行一次)"""
         today = datetime.now().strftime("%Y-%m-%d")
-        candidates = []
-        weights = []
-        active_urls = [k for k, v in self.data["articles"].items() if v.get("status") == "active"]
-        for url in active_urls:
-            info = self.data["articles"][url]
-            if info.get("last_read_at") == today:
-                continue
-            read_count = info.get("read_count", 0)
-            if read_count == 0:
-                w = 200
-            elif read_count < 5:
-                w = 100
-            elif read_count < 20:
-                w = 50
-            elif read_count < AGING_THRESHOLD:
-                w = 20
-            else:
-                w = 5
-            candidates.append(info)
-            weights.append(w)
+        sizes = {}
+        slots = []
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT url, last_read_at, read_count FROM articles WHERE status = 'active'"
+            )
+            for url, last_read_at, read_count in rows:
+                tier = self.READ_TODAY_TIER if last_read_at == today else read_tier(read_count)
+                pos = sizes.get(tier, 0)
+                sizes[tier] = pos + 1
+                slots.append((tier, pos, url))
+            self.conn.execute("DELETE FROM tier_slots")
+            self.conn.executemany("INSERT INTO tier_slots (tier, pos, url) VALUES (?, ?, ?)", slots)
+            self._set_meta("tier_day", today)
+            self._set_meta("tier_slots", self.SLOTS_VERSION)
+
+    @staticmethod
+    def _slot_count(conn, tier) -> int:
+        row = conn.execute(
+            "SELECT pos FROM tier_slots WHERE tier = ? ORDER BY pos DESC LIMIT 1", (tier,)
+        ).fetchone()
+        return row[0] + 1 if row else 0
+
+    def _slot_remove(self, conn, url):
+        """把档内最后一篇挪到空出的位置，保持位置连续"""
+        row = conn.execute("SELECT tier, pos FROM tier_slots WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return
+        tier, pos = row
+        conn.execute("DELETE FROM tier_slots WHERE url = ?", (url,))
+        last = self._slot_count(conn, tier) - 1
+        if last > pos:
+            conn.execute(
+                "UPDATE tier_slots SET pos = ? WHERE tier = ? AND pos = ?", (pos, tier, last)
+            )
 
-        if not candidates:
-            return []
+    def _slot_place(self, conn, url, tier):
+        self._slot_remove(conn, url)
+        conn.execute(
+            "INSERT INTO tier_slots (tier, pos, url) VALUES (?, ?, ?)",
+            (tier, self._slot_count(conn, tier), url)
+        )
+
+    def _roll_slot_day(self, conn, today):
+        """跨天后把"今日已读"档里的文章放回各自的权重档"""
+        row = conn.execute("SELECT value FROM meta WHERE key = 'tier_day'").fetchone()
+        if row is not None and row[0] == today:
+            return
+        rows = conn.execute(
+            "SELECT s.url, a.read_count FROM tier_slots s JOIN articles a ON a.url = s.url "
+            "WHERE s.tier = ?", (self.READ_TODAY_TIER,)
+        ).fetchall()
+        for url, read_count in rows:
+            self._slot_place(conn, url, read_tier(read_count))
+        self._set_meta("tier_day", today)
+
+    def _get_meta(self, key, default=""):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
 
-        target_k = random.randint(MIN_READ_COUNT, MAX_READ_COUNT)
-        target_k = min(target_k, len(candidates))
-        print(f"[PLAN] 可选文章库: {len(candidates)} 篇. 计划阅读: {target_k} 篇")
+    def _write(self, op, urls=()):
+        """
+        执行一次写操作 op(conn)；挂上后台写盘器后只入队，合并到一个事务里写出。
+        urls 是这次写入新增的链接，提交前由 has_article 从 _pending_urls 中查到。
+        """
+        if self._writer is not None:
+            self._pending.append((op, urls))
+            self._pending_urls.update(urls)
+            return
+        with self._lock, self.conn:
+            op(self.conn)
+
+    def _run_ops(self, ops):
+        """
+        在一个事务里写出一批变更。失败时事务已回滚，整批放回队首等下一次写盘 (或 close) 重试；
+        _pending_urls 只在提交成功后清理，has_article 不会报告没存进库的文章。
+        """
+        with self._lock:
+            try:
+                with self.conn:
+                    for op, _ in ops:
+                        op(self.conn)
+            except Exception:
+                self._pending[:0] = ops
+                raise
+            for _, urls in ops:
+                self._pending_urls.difference_update(urls)
+
+    def _apply_pending(self):
+        """在当前线程立即写出队列中的变更"""
+        if not self._pending:
+            return
+        ops, self._pending = self._pending, []
+        self._run_ops(ops)
+
+    def _query(self, sql, params=()):
+        """读之前先应用尚未写出的变更，保证读到最新状态"""
+        self._apply_pending()
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def attach_writer(self, writer):
+        self._writer = writer
+        writer.register(self._take_pending, "db_save")
+
+    def _take_pending(self):
+        if not self._pending:
+            return None
+        ops, self._pending = self._pending, []
+        return lambda: self._run_ops(ops)
+
+    async def flush(self):
+        if self._writer is not None:
+            await self._writer.flush()
+
+    def close(self):
+        """合并 WAL 后关闭，保证提交到仓库的是单个完整文件"""
+        try:
+            self._apply_pending()
+            if self._reader is not self.conn:
+                self._reader.close()
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.close()
+        except Exception as e:
+            print(f"[DB] 关闭数据库出错: {e}")
+
+    def last_sync_date(self) -> str:
+        return self._get_meta("last_sync_date")
+
+    def needs_sync(self) -> bool:
+        today = datetime.now().strftime("%Y-%m-%d")
+        return self.last_sync_date() != today
 
+    def mark_synced(self):
+        today = datetime.now().strftime("%Y-%m-%d")
+        self._write(lambda conn: self._set_meta("last_sync_date", today))
+
+    def article_count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM articles")[0][0]
+
+    def has_article(self, url) -> bool:
+        if url in self._pending_urls:
+            return True
+        return self._reader.execute("SELECT 1 FROM articles WHERE url = ?", (url,)).fetchone() is not None
+
+    def add_articles(self, scraped_items: list):
+        rows = [(item['href'], item['text']) for item in scraped_items]
+
+        def op(conn):
+            added_count = 0
+            for url, title in rows:
+                cur = conn.execute("INSERT OR IGNORE INTO articles (url, title) VALUES (?, ?)", (url, title))
+                if cur.rowcount:
+                    added_count += 1
+                    self._slot_place(conn, url, 0)
+            conn.executemany(
+                "UPDATE articles SET title = ? WHERE url = ? AND title = 'Untitled'",
+                [(title, url) for url, title in rows if title != "Untitled"]
+            )
+            total = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            print(f"[DB] 数据库更新: 新增 {added_count} 篇，当前总库存 {total} 篇")
+
+        self._write(op, [url for url, _ in rows])
+
+    def mark_invalid(self, url):
+        def op(conn):
+            cur = conn.execute("UPDATE articles SET status = 'invalid' WHERE url = ?", (url,))
+            if cur.rowcount:
+                self._slot_remove(conn, url)
+                print(f"[DB] 链接标记为无效: {url}")
+
+        self._write(op)
+
+    def record_read(self, url):
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        def op(conn):
+            conn.execute(
+                "UPDATE articles SET last_read_at = ?, read_count = read_count + 1 WHERE url = ?",
+                (today, url)
+            )
+            row = conn.execute("SELECT status FROM articles WHERE url = ?", (url,)).fetchone()
+            if row is not None and row[0] == "active":
+                self._roll_slot_day(conn, today)
+                self._slot_place(conn, url, self.READ_TODAY_TIER)
+
+        self._write(op)
+
+    def tier_sizes(self) -> dict:
+        """各权重档的候选篇数与今日已读篇数，每档一次主键查找"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        if self._get_meta("tier_day") != today:
+            self._write(lambda conn: self._roll_slot_day(conn, today))
+        sizes = {}
+        for tier, key in list(enumerate(TIER_WEIGHTS)) + [(self.READ_TODAY_TIER, "read_today")]:
+            rows = self._query(
+                "SELECT pos + 1 FROM tier_slots WHERE tier = ? ORDER BY pos DESC LIMIT 1", (tier,)
+            )
+            sizes[key] = rows[0][0] if rows else 0
+        return sizes
+
+    def get_weighted_candidates(self) -> list:
+        sizes = self.tier_sizes()
+        print(f"[PLAN] 权重分桶: {format_tier_sizes(sizes)}")
+        picks = plan_picks([sizes[w] for w in TIER_WEIGHTS])
         selected = []
-        temp_cand = list(candidates)
-        temp_weight = list(weights)
-        for _ in range(target_k):
-            if not temp_cand:
-                break
-            chosen = random.choices(temp_cand, weights=temp_weight, k=1)[0]
-            selected.append(chosen)
-            idx = temp_cand.index(chosen)
-            temp_cand.pop(idx)
-            temp_weight.pop(idx)
+        for tier, pos in picks:
+            rows = self._query(
+                "SELECT a.url, a.title, a.status, a.last_read_at, a.read_count "
+                "FROM tier_slots s JOIN articles a ON a.url = s.url "
+                "WHERE s.tier = ? AND s.pos = ?",
+                (tier, pos)
+            )
+            if rows:
+                selected.append(dict(rows[0]))
         return selected
 
+    def iter_articles(self, batch: int = 500):
+        """按 url 顺序分批读取，内存占用与库大小无关"""
+        self._apply_pending()
+        with self._lock:
+            cursor = self.conn.execute(
+                f"SELECT {', '.join(ARTICLE_FIELDS)} FROM articles ORDER BY url"
+            )
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+
+    def compact(self):
+        """回收空闲页 (WAL 在 close 时合并)"""
+        self._apply_pending()
+        with self._lock:
+            self.conn.execute("VACUUM")
+
+
+ARTICLE_FIELDS = ("url", "title", "status", "last_read_at", "read_count")
+
+
+def open_db(read_only: bool = False):
+    """按 DB_STORAGE_MODE 打开文章库；read_only 时不迁移、压缩或导入磁盘上的库"""
+    if DB_STORAGE_MODE == "sqlite":
+        return SQLiteArticleDB(SQLITE_DB_FILE, import_from=DB_FILE, read_only=read_only)
+    return ArticleDB(DB_FILE, read_only=read_only)
+
 
 # ================= 拟人化操作函数 =================
 
@@ -462,20 +2309,45 @@ async def human_scroll(page: Page, max_scrolls=1):
             await human_delay(0.5, 1.2)
 
 
-async def check_captcha(page: Page, tag="unknown") -> bool:
+# 一次页面内求值拿齐标题、验证码元素、正文长度和图片数，正文本身不回传
+PROBE_PAGE_JS = r"""
+(withText) => {
+  const body = document.body;
+  return {
+    title: document.title || "",
+    captcha_element: !!(document.querySelector("#captcha-verify-image") ||
+                        document.querySelector(".captcha_verify_container")),
+    text_length: withText && body ? (body.innerText || "").length : 0,
+    img_count: document.querySelectorAll(
+      'article img, .tt-input__content img, .article-content img, .pgc-img img'
+    ).length,
+  };
+}
+"""
+
+def count_round_trip(label: str, n: int = 1):
+    """各类页面交互的 CDP 往返次数，计入 TRACER 随运行汇总输出"""
+    TRACER.count(label, n)
+
+
+async def probe_page(page: Page, with_text: bool = False) -> dict:
+    count_round_trip("probe")
+    return await page.evaluate(PROBE_PAGE_JS, with_text)
+
+
+async def check_captcha(page: Page, tag="unknown", probe: dict = None) -> bool:
+    """probe 为已取得的 probe_page 结果时不再访问页面"""
     try:
-        title = await page.title()
-        is_captcha = False
-        if any(kw in title for kw in ["验证", "安全检测", "captcha", "verify"]):
-            is_captcha = True
-        if not is_captcha:
-            if await page.query_selector("#captcha-verify-image") or \
-               await page.query_selector(".captcha_verify_container"):
-                is_captcha = True
+        if probe is None:
+            probe = await probe_page(page)
+        title = probe["title"]
+        is_captcha = probe["captcha_element"] or \
+            any(kw in title for kw in ["验证", "安全检测", "captcha", "verify"])
         if is_captcha:
             print(f"[ALERT] {tag} 阶段检测到验证码! Title: {title}")
-            screenshot_path = DEBUG_DIR / f"captcha_{tag}_latest.png"
-            await page.screenshot(path=screenshot_path)
+            RUN_METRICS.inc("captcha_hits")
+            kind = "sync_debug" if tag.startswith("sync") else "captcha"
+            screenshot_path = await ARTIFACTS.screenshot(page, f"captcha_{tag}_latest", kind)
             print(f"[ALERT] 验证码截图已保存: {screenshot_path}")
             return True
         return False
@@ -486,13 +2358,142 @@ async def check_captcha(page: Page, tag="unknown") -> bool:
 
 # ================= 核心任务逻辑 =================
 
+FEED_GROWN_JS = """
+(base) => {
+  const n = document.querySelectorAll("a[href]").length;
+  return n !== base ? n : false;
+}
+"""
+
+
+class FeedWaiter:
+    """
+    同步页的就绪等待：滚动后等信息流条目数变化、再等信息流请求平静下来，都有超时。
+    取代固定时长的 sleep，让同步耗时跟随页面实际加载速度；同时统计等待总时长。
+    保留一小段随机停顿作为拟人化节奏的下限。
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.waited = 0.0
+        self._inflight = set()
+        # 最近一次记录的页面链接数，同时用作同步进度的深度
+        self.count = 0
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        if request.resource_type in ("xhr", "fetch"):
+            self._inflight.add(request)
+
+    def _on_done(self, request):
+        self._inflight.discard(request)
+
+    async def _settle_network(self, deadline):
+        while self._inflight and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+    async def settle(self, timeout: float, min_pause=(0.5, 1.0)):
+        """页面加载/刷新后：等在途的信息流请求结束，并记下当前条目数"""
+        start = time.monotonic()
+        await human_delay(*min_pause)
+        await self._settle_network(start + timeout)
+        try:
+            self.count = await self.page.evaluate('() => document.querySelectorAll("a[href]").length')
+        except Exception:
+            pass
+        self.waited += time.monotonic() - start
+
+    async def grown(self, timeout: float = SYNC_WAIT_TIMEOUT, min_pause=(0.3, 0.8)) -> bool:
+        """滚动后：等条目数与上次记录不同，再等请求平静；超时返回 False"""
+        start = time.monotonic()
+        await human_delay(*min_pause)
+        # Playwright 的 timeout=0 表示不限时，这里至少留 50ms
+        remaining = max(0.05, timeout - (time.monotonic() - start))
+        grown = False
+        try:
+            handle = await self.page.wait_for_function(
+                FEED_GROWN_JS, arg=self.count, polling=200, timeout=remaining * 1000
+            )
+            self.count = await handle.json_value()
+            grown = True
+        except Exception:
+            pass
+        await self._settle_network(start + timeout)
+        self.waited += time.monotonic() - start
+        return grown
+
+
+class ResourceBlocker:
+    """
+    同步页的请求拦截策略：中止指定类型和域名的请求，只放行抽取文章列表所需的内容。
+    被中止的请求根本不会下载，无法得知其大小，所以统计的是跳过的请求数 (按类型/域名)
+    以及放行请求按 content-length 计的实际传输字节，可与未开启拦截时的运行对比。
+    """
+
+    def __init__(self, resource_types=SYNC_BLOCKED_RESOURCE_TYPES, hosts=SYNC_BLOCKED_HOSTS):
+        self.resource_types = set(resource_types)
+        self.hosts = tuple(hosts)
+        self.skipped = {}
+        self.allowed = 0
+        self.allowed_bytes = 0
+
+    async def install(self, page: Page):
+        await page.route("**/*", self._handle)
+        page.on("response", self._on_response)
+
+    def _blocked_reason(self, request):
+        if request.resource_type in self.resource_types:
+            return request.resource_type
+        host = urlparse(request.url).hostname or ""
+        for blocked in self.hosts:
+            if host == blocked or host.endswith("." + blocked):
+                return blocked
+        return None
+
+    async def _handle(self, route):
+        reason = self._blocked_reason(route.request)
+        if reason is None:
+            self.allowed += 1
+            await route.continue_()
+            return
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        await route.abort("blockedbyclient")
+
+    def _on_response(self, response):
+        length = response.headers.get("content-length", "")
+        if length.isdigit():
+            self.allowed_bytes += int(length)
+
+    def summary(self) -> str:
+        total = sum(self.skipped.values())
+        detail = ", ".join(f"{k} {v}" for k, v in sorted(self.skipped.items(), key=lambda kv: -kv[1]))
+        return (f"跳过 {total} 个请求 ({detail or '无'})；"
+                f"放行 {self.allowed} 个请求，传输约 {self.allowed_bytes / 1024:.0f} KB")
+
+
+async def resume_depth(page: Page, waiter: FeedWaiter, depth: int) -> int:
+    """快速滚到上次尝试已到达的深度 (按页面链接数计)，途中不做提取；页面不再增长时提前停止"""
+    steps = 0
+    stalls = 0
+    while waiter.count < depth and stalls < 3 and steps < SYNC_RESUME_MAX_STEPS:
+        await page.mouse.wheel(0, random.randint(1200, 1800))
+        if await waiter.grown(min_pause=(0.1, 0.3)):
+            stalls = 0
+        else:
+            stalls += 1
+        steps += 1
+    return steps
+
+
 async def sync_task(context: BrowserContext, db: ArticleDB):
     """
     全量同步任务：抓取个人主页文章列表，写入数据库。
     """
     print(">>> [SYNC] 开始执行全量同步任务...")
 
-    current_count = len(db.data.get("articles", {}))
+    current_count = db.article_count()
     FULL_SYNC_THRESHOLD = 100
     is_full_sync = current_count < FULL_SYNC_THRESHOLD
 
@@ -507,31 +2508,50 @@ async def sync_task(context: BrowserContext, db: ArticleDB):
         early_stop_count = 30
         no_new_threshold = 3
 
+    # 上次运行中断留下的进度先合并入库 (模式已按合并前的库存确定)
+    checkpoint = SyncCheckpoint(SYNC_CHECKPOINT_FILE)
+    resumed, _ = checkpoint.load()
+    if resumed:
+        print(f"[SYNC] ♻ 发现未完成的同步进度: {len(resumed)} 篇，先合并入库")
+        db.add_articles(resumed)
+        await db.flush()
+
     for attempt in range(1, MAX_RETRIES + 1):
         print(f">>> [SYNC] 第 {attempt}/{MAX_RETRIES} 次尝试连接...")
         page = await context.new_page()
+        waiter = FeedWaiter(page)
+        harvester = LinkHarvester(on_new=lambda items: checkpoint.append(items, waiter.count))
+        resumed, target_depth = checkpoint.load()
+        harvester.seed(resumed)
+        harvester.attach(page)
+        links = harvester.links
+        blocker = ResourceBlocker() if SYNC_BLOCK_RESOURCES else None
+        attempt_start = time.monotonic()
+        attempt_span = TRACER.begin("sync_attempt", attempt=attempt)
 
         try:
+            if blocker is not None:
+                await blocker.install(page)
             print("[SYNC] 🚀 直接访问目标用户主页...")
             try:
-                await page.goto(TOUTIAO_URL, wait_until="networkidle", timeout=45000)
+                with TRACER.span("goto", page="sync", wait_until="networkidle"):
+                    await page.goto(TOUTIAO_URL, wait_until="networkidle", timeout=45000)
                 print("[SYNC] ✓ networkidle 完成")
             except Exception as timeout_err:
                 print(f"[SYNC] ⚠ networkidle 超时，尝试降级: {timeout_err}")
                 try:
-                    await page.goto(TOUTIAO_URL, wait_until="domcontentloaded", timeout=30000)
+                    with TRACER.span("goto", page="sync", wait_until="domcontentloaded"):
+                        await page.goto(TOUTIAO_URL, wait_until="domcontentloaded", timeout=30000)
                     print("[SYNC] ✓ domcontentloaded 完成")
                 except:
                     raise Exception("页面加载完全失败")
 
-            await human_delay(4, 6)
+            await waiter.settle(timeout=6)
 
             if await check_captcha(page, f"sync_try_{attempt}"):
                 raise Exception("Captcha detected")
 
             articles_found = False
-            links = []
-            all_seen_urls = set()
 
             article_selectors = [
                 'a[href*="/article/"]',
@@ -546,66 +2566,72 @@ async def sync_task(context: BrowserContext, db: ArticleDB):
                 except:
                     continue
 
+            if target_depth > waiter.count:
+                print(f"[SYNC] ⏩ 已有 {len(links)} 篇进度，快速滚动到上次位置 (页面链接数 {target_depth})...")
+                steps = await resume_depth(page, waiter, target_depth)
+                new_items = await harvester.collect(page)
+                print(f"[SYNC] ⏩ 滚动 {steps} 次后到达 {waiter.count}，新增 {len(new_items)} 篇")
+
             print(f"[SYNC] 开始滚动加载 (最多 {max_scroll_rounds} 次)...")
             no_new_count = 0
-            last_total = 0
+            known_streak = 0
 
             for scroll_round in range(max_scroll_rounds):
-                scroll_distance = random.randint(400, 700)
-                await page.mouse.wheel(0, scroll_distance)
-                await asyncio.sleep(random.uniform(1.5, 2.5))
-                if random.random() < 0.1:
-                    await page.mouse.wheel(0, -random.randint(80, 150))
-                    await asyncio.sleep(0.3)
-
-                if (scroll_round + 1) % 3 == 0 or scroll_round == 0:
-                    current_links = await page.evaluate(EXTRACT_LINKS_JS)
-                    new_urls = [l for l in current_links if l['href'] not in all_seen_urls]
-                    for l in current_links:
-                        all_seen_urls.add(l['href'])
-                    links = current_links
-                    new_this_round = len(links) - last_total
-                    last_total = len(links)
-
-                    if is_full_sync:
-                        print(f"[SYNC] 📊 滚动 {scroll_round+1}/{max_scroll_rounds}: 累计 {len(links)} 篇 (+{new_this_round})")
-                    else:
-                        print(f"[SYNC] 滚动 {scroll_round+1}/{max_scroll_rounds}: 当前 {len(links)} 篇")
-
-                    if links and len(links) > 0:
-                        articles_found = True
-
-                    if not is_full_sync and len(links) >= early_stop_count:
-                        print(f"[SYNC] ✓ 增量模式已获取 {len(links)} 篇，提前结束")
-                        break
-
-                    if new_this_round == 0:
-                        no_new_count += 1
-                        if no_new_count >= no_new_threshold:
-                            if is_full_sync:
-                                print(f"[SYNC] 📍 已滑到底部！连续 {no_new_count} 次无新内容")
-                            else:
-                                print(f"[SYNC] 连续 {no_new_count} 次无新内容，停止")
+                with TRACER.span("scroll_round", round=scroll_round + 1) as round_span:
+                    scroll_distance = random.randint(400, 700)
+                    await page.mouse.wheel(0, scroll_distance)
+                    await waiter.grown()
+                    if random.random() < 0.1:
+                        await page.mouse.wheel(0, -random.randint(80, 150))
+                        await asyncio.sleep(0.3)
+
+                    if (scroll_round + 1) % 3 == 0 or scroll_round == 0:
+                        new_items = await harvester.collect(page)
+                        new_this_round = len(new_items)
+                        round_span["new"] = new_this_round
+                        if not is_full_sync:
+                            for item in new_items:
+                                known_streak = known_streak + 1 if db.has_article(item['href']) else 0
+
+                        if is_full_sync:
+                            print(f"[SYNC] 📊 滚动 {scroll_round+1}/{max_scroll_rounds}: 累计 {len(links)} 篇 (+{new_this_round})")
+                        else:
+                            print(f"[SYNC] 滚动 {scroll_round+1}/{max_scroll_rounds}: 当前 {len(links)} 篇")
+
+                        if harvester.page_links:
+                            articles_found = True
+
+                        if not is_full_sync and harvester.harvested >= early_stop_count:
+                            print(f"[SYNC] ✓ 增量模式已获取 {harvester.harvested} 篇，提前结束")
                             break
-                    else:
-                        no_new_count = 0
 
-            await human_delay(2, 3)
-            final_links = await page.evaluate(EXTRACT_LINKS_JS)
-            if final_links and len(final_links) > len(links):
-                links = final_links
+                        if not is_full_sync and known_streak >= SYNC_KNOWN_STREAK_STOP:
+                            saved_rounds = max_scroll_rounds - (scroll_round + 1)
+                            print(f"[SYNC] ✓ 连续 {known_streak} 篇均已在库中 (水位线)，提前结束，节省 {saved_rounds} 轮滚动")
+                            break
+
+                        if new_this_round == 0:
+                            no_new_count += 1
+                            if no_new_count >= no_new_threshold:
+                                if is_full_sync:
+                                    print(f"[SYNC] 📍 已滑到底部！连续 {no_new_count} 次无新内容")
+                                else:
+                                    print(f"[SYNC] 连续 {no_new_count} 次无新内容，停止")
+                                break
+                        else:
+                            no_new_count = 0
+
+            await waiter.settle(timeout=3)
+            await harvester.collect(page)
 
             if is_full_sync and no_new_count < no_new_threshold:
                 print("[SYNC] 🔄 全量模式：继续尝试加载更多...")
                 extra_rounds = 20
                 for extra in range(extra_rounds):
                     await page.mouse.wheel(0, random.randint(500, 800))
-                    await asyncio.sleep(random.uniform(1.2, 2.0))
+                    await waiter.grown(timeout=2.0)
                     if (extra + 1) % 5 == 0:
-                        extra_links = await page.evaluate(EXTRACT_LINKS_JS)
-                        new_extra = len(extra_links) - len(links)
-                        if extra_links:
-                            links = extra_links
+                        new_extra = len(await harvester.collect(page))
                         print(f"[SYNC] 📊 额外滚动 {extra+1}/{extra_rounds}: 累计 {len(links)} 篇 (+{new_extra})")
                         if new_extra == 0:
                             no_new_count += 1
@@ -616,76 +2642,76 @@ async def sync_task(context: BrowserContext, db: ArticleDB):
                             no_new_count = 0
 
             print(f"\n[SYNC] 最终提取: {len(links)} 篇文章")
+            if harvester.use_feed_api:
+                source = f"信息流接口 ({harvester.api_responses} 个响应)" if harvester.api_responses else "DOM 提取 (未捕获到接口响应)"
+                print(f"[SYNC] 数据来源: {source}")
 
-            if not links or len(links) == 0:
+            # 续传放入的链接不算本次成果，页面本身没返回链接时仍走刷新/重试；
+            # 页面返回的都已在检查点里 (上次已收集完整个信息流) 也算成功
+            if not harvester.page_links:
                 if attempt < MAX_RETRIES:
                     print("[SYNC] 未发现文章，尝试刷新页面...")
-                    await page.screenshot(path=DEBUG_DIR / f"before_refresh_attempt_{attempt}.png")
+                    await ARTIFACTS.screenshot(page, f"before_refresh_attempt_{attempt}", "sync_debug")
                     for refresh_attempt in range(2):
                         print(f"[SYNC] 第 {refresh_attempt+1} 次刷新...")
                         await page.reload(wait_until="networkidle", timeout=30000)
-                        await human_delay(5, 7)
+                        await waiter.settle(timeout=7)
                         for i in range(10):
                             await page.mouse.wheel(0, random.randint(400, 600))
-                            await asyncio.sleep(random.uniform(0.8, 1.2))
-                        await human_delay(3, 5)
-                        links = await page.evaluate(EXTRACT_LINKS_JS)
-                        if links and len(links) > 0:
+                            await waiter.grown(timeout=1.2)
+                        await waiter.settle(timeout=5)
+                        await harvester.collect(page)
+                        if harvester.page_links:
                             articles_found = True
-                            print(f"[SYNC] ✓ 刷新后发现 {len(links)} 篇文章")
+                            print(f"[SYNC] ✓ 刷新后发现 {harvester.page_links} 篇文章")
                             break
             else:
                 articles_found = True
 
-            if articles_found and links and len(links) > 0:
+            if articles_found and harvester.page_links:
                 mode_str = "全量" if is_full_sync else "增量"
-                print(f"\n[SYNC] ✅ {mode_str}同步成功! 第 {attempt} 次尝试，共 {len(links)} 篇文章")
-                new_articles = [l for l in links if l['href'] not in db.data.get("articles", {})]
+                resumed_str = f" (含续传 {harvester.seeded} 篇)" if harvester.seeded else ""
+                print(f"\n[SYNC] ✅ {mode_str}同步成功! 第 {attempt} 次尝试，共 {len(links)} 篇文章{resumed_str}")
+                new_articles = [l for l in links if not db.has_article(l['href'])]
                 print(f"[SYNC] 📈 其中新文章: {len(new_articles)} 篇")
+                RUN_METRICS.set("links_harvested", harvester.page_links)
+                RUN_METRICS.set("new_articles", len(new_articles))
                 print("[SYNC] 文章样本:")
                 for i, link in enumerate(links[:5], 1):
                     print(f"       {i}. [{link.get('type','?')}] {link['text'][:40]}...")
 
                 db.add_articles(links)
                 db.mark_synced()
+                await db.flush()
+                checkpoint.clear()
 
                 try:
-                    await page.screenshot(path=DEBUG_DIR / "sync_success_latest.png")
+                    await ARTIFACTS.screenshot(page, "sync_success_latest", "sync_success")
                     print("[SYNC] ✓ 已保存成功截图")
                 except:
                     pass
 
                 print("[SYNC] 清理旧的调试/错误文件...")
-                cleanup_patterns = [
-                    "error_sync_*.png", "debug_sync_fail_*.png",
-                    "before_refresh_*.png", "sync_source_*.html",
-                    "captcha_sync_*.png", "sync_source_final_fail.html",
-                ]
-                cleaned_count = 0
                 try:
-                    for pattern in cleanup_patterns:
-                        for file_path in DEBUG_DIR.glob(pattern):
-                            try:
-                                file_path.unlink(missing_ok=True)
-                                cleaned_count += 1
-                            except:
-                                pass
+                    cleaned_count = ARTIFACTS.discard("sync_debug")
                     if cleaned_count > 0:
                         print(f"[SYNC] ✓ 已清理 {cleaned_count} 个旧文件")
                 except Exception as clean_err:
                     print(f"[WARN] 清理文件时出错: {clean_err}")
 
+                attempt_span["outcome"] = "ok"
+                attempt_span["links"] = len(links)
                 await page.close()
                 return
             else:
                 print(f"[WARN] 第 {attempt} 次尝试未能提取到文章")
                 try:
-                    await page.screenshot(path=DEBUG_DIR / f"debug_sync_fail_attempt_{attempt}.png")
+                    await ARTIFACTS.screenshot(page, f"debug_sync_fail_attempt_{attempt}", "sync_debug")
                 except:
                     pass
                 try:
                     content = await page.content()
-                    (DEBUG_DIR / f"sync_source_attempt_{attempt}.html").write_text(content, encoding="utf-8")
+                    ARTIFACTS.write_text(f"sync_source_attempt_{attempt}.html", "sync_debug", content)
                 except:
                     pass
                 if attempt < MAX_RETRIES:
@@ -693,9 +2719,18 @@ async def sync_task(context: BrowserContext, db: ArticleDB):
 
         except Exception as e:
             print(f"[SYNC] ❌ 第 {attempt} 次尝试失败: {e}")
+            attempt_span["error"] = str(e)[:200]
+            if harvester.harvested:
+                # 已收集的链接先入库，检查点保留，下次尝试从这里继续
+                try:
+                    db.add_articles(links[harvester.seeded:])
+                    await db.flush()
+                    print(f"[SYNC] 💾 已保存本次已收集的 {harvester.harvested} 篇，下次从该进度继续")
+                except Exception as save_err:
+                    print(f"[WARN] 保存部分同步结果失败: {save_err}")
             try:
                 if not page.is_closed():
-                    await page.screenshot(path=DEBUG_DIR / f"error_sync_attempt_{attempt}.png")
+                    await ARTIFACTS.screenshot(page, f"error_sync_attempt_{attempt}", "sync_debug")
             except:
                 pass
             if attempt == MAX_RETRIES:
@@ -703,7 +2738,7 @@ async def sync_task(context: BrowserContext, db: ArticleDB):
                 try:
                     if not page.is_closed():
                         content = await page.content()
-                        (DEBUG_DIR / "sync_source_final_fail.html").write_text(content, encoding="utf-8")
+                        ARTIFACTS.write_text("sync_source_final_fail.html", "sync_debug", content)
                 except:
                     pass
             else:
@@ -711,6 +2746,12 @@ async def sync_task(context: BrowserContext, db: ArticleDB):
                 print(f"[WAIT] 等待 {wait_time} 秒后重试...")
                 await asyncio.sleep(wait_time)
         finally:
+            TRACER.end(attempt_span, "failed")
+            elapsed = time.monotonic() - attempt_start
+            print(f"[SYNC] ⏱ 第 {attempt} 次尝试耗时 {elapsed:.1f}s：等待页面 {waiter.waited:.1f}s，"
+                  f"其余 (加载/滚动/提取) {elapsed - waiter.waited:.1f}s")
+            if blocker is not None:
+                print(f"[SYNC] 🚫 请求拦截: {blocker.summary()}")
             try:
                 if not page.is_closed():
                     await page.close()
@@ -752,11 +2793,13 @@ async def read_article_task(
         # ============================================================
         # 1. 从主页跳转到文章（保持真实 Referer = 个人主页）
         # ============================================================
-        await home_page.evaluate(f"window.location.href = '{url}'")
-        try:
-            await home_page.wait_for_load_state("domcontentloaded", timeout=45000)
-        except Exception as e:
-            print(f"[READ] ⚠ wait_for_load_state 超时，继续: {e}")
+        with TRACER.span("goto", page="article") as goto_span:
+            await home_page.evaluate(f"window.location.href = '{url}'")
+            try:
+                await home_page.wait_for_load_state("domcontentloaded", timeout=45000)
+            except Exception as e:
+                goto_span["outcome"] = "timeout"
+                print(f"[READ] ⚠ wait_for_load_state 超时，继续: {e}")
 
         # 强制等待渲染
         await asyncio.sleep(3)
@@ -764,11 +2807,10 @@ async def read_article_task(
         # ============================================================
         # 2. 首屏截图
         # ============================================================
-        start_ss_name = f"read_{timestamp_str}_{article_id}_START.png"
-        start_ss_path = str(DEBUG_DIR / start_ss_name)
+        start_ss_name = f"read_{timestamp_str}_{article_id}_START"
         try:
-            await home_page.screenshot(path=start_ss_path, full_page=False)
-            print(f"[READ] 📸 首屏已保存: {start_ss_name}")
+            start_ss_path = await ARTIFACTS.screenshot(home_page, start_ss_name, "read_start", full_page=False)
+            print(f"[READ] 📸 首屏已保存: {Path(start_ss_path).name}")
         except Exception as e:
             print(f"[WARN] 首屏截图失败: {e}")
             start_ss_path = ""
@@ -776,12 +2818,12 @@ async def read_article_task(
         # ============================================================
         # 3. 异常检测
         # ============================================================
-        if await check_captcha(home_page, "read_start"):
+        probe = await probe_page(home_page, with_text=True)
+        if await check_captcha(home_page, "read_start", probe):
             append_report(url, title_preview, start_ss_path, "captcha", "触发验证码")
             return
 
-        page_title   = await home_page.title()
-        page_content = await home_page.evaluate("document.body.innerText")
+        page_title = probe["title"]
 
         # 登录墙 / 404 / 失效检测
         invalid_keywords = ["404", "页面不存在", "文章已删除", "参数错误", "访问受限", "登录"]
@@ -794,15 +2836,8 @@ async def read_article_task(
         # ============================================================
         # 4. 计算停留时长
         # ============================================================
-        word_count = len(page_content)
-        img_count = await home_page.evaluate("""
-            () => {
-                const imgs = document.querySelectorAll(
-                    'article img, .tt-input__content img, .article-content img, .pgc-img img'
-                );
-                return imgs.length;
-            }
-        """)
+        word_count = probe["text_length"]
+        img_count  = probe["img_count"]
 
         text_time  = word_count / 25.0
         img_time   = img_count * 5.0
@@ -854,11 +2889,10 @@ async def read_article_task(
         # ============================================================
         # 7. 完读截图
         # ============================================================
-        end_ss_name = f"read_{timestamp_str}_{article_id}_END.png"
-        end_ss_path = str(DEBUG_DIR / end_ss_name)
+        end_ss_name = f"read_{timestamp_str}_{article_id}_END"
         try:
-            await home_page.screenshot(path=end_ss_path)
-            print(f"[READ] 📸 完读截图已保存: {end_ss_name}")
+            end_ss_path = await ARTIFACTS.screenshot(home_page, end_ss_name, "read_end")
+            print(f"[READ] 📸 完读截图已保存: {Path(end_ss_path).name}")
         except Exception as e:
             print(f"[READ] ⚠ 完读截图失败: {e}")
             end_ss_path = ""
@@ -885,24 +2919,12 @@ async def read_article_task(
         except Exception as e:
             print(f"[READ] ⚠ 返回主页失败（下一篇可能出错）: {e}")
 
-        # ============================================================
-        # 9. 清理旧截图（只保留最新 5 张）
-        # ============================================================
-        try:
-            for pattern, keep in [("*_START.png", 5), ("*_END.png", 5), ("error_read_*.png", 3)]:
-                files = sorted(DEBUG_DIR.glob(pattern), key=lambda x: x.stat().st_mtime, reverse=True)
-                for old in files[keep:]:
-                    old.unlink(missing_ok=True)
-        except Exception as e:
-            print(f"[READ] ⚠ 清理截图失败: {e}")
-
     except Exception as e:
         print(f"[READ] ❌ 异常中断: {e}")
-        err_name = f"error_read_{timestamp_str}.png"
-        err_path = str(DEBUG_DIR / err_name)
+        err_name = f"error_read_{timestamp_str}"
         try:
-            await home_page.screenshot(path=err_path)
-            print(f"[READ] 已保存错误现场: {err_name}")
+            err_path = await ARTIFACTS.screenshot(home_page, err_name, "read_error")
+            print(f"[READ] 已保存错误现场: {Path(err_path).name}")
         except:
             err_path = ""
         append_report(url, title_preview, err_path, "failed", str(e)[:100])
@@ -918,9 +2940,10 @@ async def read_article_task(
 
 # ================= 主程序入口 =================
 
-async def main():
-    db = ArticleDB(DB_FILE)
+async def run_tasks(db):
+    from playwright.async_api import async_playwright
 
+    check_stealth()
     vp = random.choice(VIEWPORTS)
     ua = get_pc_user_agent()
 
@@ -961,10 +2984,11 @@ async def main():
         # ============================================================
         print("[WARMUP] 执行热身...")
         warmup_page = None
+        warmup_span = TRACER.begin("warmup")
         try:
             warmup_page = await context.new_page()
             await warmup_page.goto(
-                "https://www.toutiao.com/",
+                TOUTIAO_HOME_URL,
                 wait_until="domcontentloaded",
                 timeout=30000
             )
@@ -975,7 +2999,10 @@ async def main():
             print("[WARMUP] ✓ 热身完成")
         except Exception as e:
             print(f"[WARMUP] ⚠ 热身失败(可忽略): {e}")
+            warmup_span["outcome"] = "error"
+            warmup_span["error"] = str(e)[:200]
         finally:
+            TRACER.end(warmup_span)
             if warmup_page:
                 try:
                     await warmup_page.close()
@@ -987,7 +3014,7 @@ async def main():
         # ============================================================
         # 步骤 1：同步文章列表
         # ============================================================
-        if db.needs_sync() or not db.data.get("articles"):
+        if db.needs_sync() or not db.article_count():
             print("\n[TASK] 开始同步任务...")
             await sync_task(context, db)
         else:
@@ -1010,7 +3037,8 @@ async def main():
         print("[INIT] 打开复用主页 Page...")
         home_page = await context.new_page()
         try:
-            await home_page.goto(TOUTIAO_URL, wait_until="domcontentloaded", timeout=30000)
+            with TRACER.span("goto", page="home", wait_until="domcontentloaded"):
+                await home_page.goto(TOUTIAO_URL, wait_until="domcontentloaded", timeout=30000)
             await human_delay(2, 4)
             print("[INIT] ✓ 主页已就绪，开始逐篇阅读")
         except Exception as e:
@@ -1049,5 +3077,250 @@ async def main():
         print("="*50)
 
 
+async def main():
+    TRACER.start_run()
+    db = open_db()
+    writer = BackgroundWriter()
+    db.attach_writer(writer)
+    REPORT_EVENTS.attach_writer(writer, "report_write")
+    ARTIFACTS.attach_writer(writer, "artifact_index")
+    # 追踪日志最后注册，停止时能带上其他写盘阶段的记录
+    TRACER.log.attach_writer(writer)
+    writer.start()
+    try:
+        await run_tasks(db)
+    finally:
+        TRACER.finish_run()
+        RUN_METRICS.set("articles_total", db.article_count())
+        await writer.stop()
+        db.close()
+        summary = TRACER.summary()
+        if summary:
+            print(summary)
+        try:
+            RUN_METRICS.finish(db.db_path, TRACER)
+        except Exception as e:
+            print(f"[WARN] 记录运行指标失败: {e}")
+        try:
+            render_report()
+        except Exception as e:
+            print(f"[WARN] 生成报告失败: {e}")
+
+
+# ================= 性能剖析 (--profile) =================
+
+# 事件循环延迟的采样间隔 (秒)，以及摘要中视为“卡顿”的阈值
+LOOP_LAG_INTERVAL = 0.05
+LOOP_LAG_STALL = 0.1
+PROFILE_TOP_N = 25
+# 关键协程/函数，摘要里单独列出
+PROFILE_FOCUS = r"sync_task|read_article_task|append_report|save|_write_snapshot|_run_ops|flush|evaluate"
+
+
+async def _watch_loop_lag(samples: list, interval: float = LOOP_LAG_INTERVAL):
+    """按固定间隔睡眠，记录每次被唤醒比预定时间晚了多久"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def _main_with_lag_watch(samples: list):
+    watcher = asyncio.create_task(_watch_loop_lag(samples))
+    try:
+        await main()
+    finally:
+        watcher.cancel()
+
+
+def _format_bytes(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f} MB" if n >= 1024 * 1024 else f"{n / 1024:.1f} KB"
+
+
+def run_profiled():
+    """
+    在 cProfile (按 CPU 时间计) 与 tracemalloc 下运行 main()，同时采样事件循环延迟。
+    后台写盘在线程池中执行，不在 cProfile 统计内，其耗时见 TRACER 的 db_save 阶段。
+    """
+    import cProfile
+    import io
+    import pstats
+
+    samples = []
+    tracemalloc.start()
+    profiler = cProfile.Profile(time.process_time)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    profiler.enable()
+    try:
+        asyncio.run(_main_with_lag_watch(samples))
+    finally:
+        profiler.disable()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        tracemalloc.stop()
+
+        lines = [
+            f"运行耗时 {wall:.1f}s，主线程 CPU {cpu:.1f}s",
+            f"tracemalloc 峰值: {_format_bytes(peak)}",
+        ]
+        if samples:
+            lags = sorted(samples)
+            stalls = sum(1 for lag in lags if lag >= LOOP_LAG_STALL)
+            lines.append(
+                f"事件循环延迟 (每 {LOOP_LAG_INTERVAL * 1000:.0f}ms 采样，共 {len(lags)} 次): "
+                f"p50 {_percentile(lags, 0.5) * 1000:.1f}ms，p95 {_percentile(lags, 0.95) * 1000:.1f}ms，"
+                f"最大 {lags[-1] * 1000:.1f}ms，超过 {LOOP_LAG_STALL * 1000:.0f}ms 的 {stalls} 次"
+            )
+        lines.append("")
+        lines.append("当前占用内存最多的分配位置:")
+        for stat in snapshot.statistics("lineno")[:10]:
+            frame = stat.traceback[0]
+            lines.append(f"  {_format_bytes(stat.size):>10}  {stat.count:>7} 块  {frame.filename}:{frame.lineno}")
+
+        for title, restriction in (("关键函数 CPU 耗时", (PROFILE_FOCUS, PROFILE_TOP_N)),
+                                   (f"CPU 累计耗时前 {PROFILE_TOP_N} 的函数", (PROFILE_TOP_N,))):
+            buf = io.StringIO()
+            pstats.Stats(profiler, stream=buf).strip_dirs().sort_stats("cumulative").print_stats(*restriction)
+            body = buf.getvalue()
+            # 去掉 pstats 的表头说明，只保留表格
+            start = body.find("   ncalls")
+            lines.append("")
+            lines.append(f"{title}:")
+            lines.append(body[start:].rstrip() if start >= 0 else body.rstrip())
+
+        tracer_summary = TRACER.summary()
+        if tracer_summary:
+            lines.append("")
+            lines.append(tracer_summary)
+
+        try:
+            profiler.dump_stats(str(PROFILE_FILE))
+            PROFILE_SUMMARY.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            print(f"[PROFILE] 剖析数据: {PROFILE_FILE}")
+            print(f"[PROFILE] 摘要: {PROFILE_SUMMARY}")
+            print("\n".join(lines[:3]))
+        except Exception as e:
+            print(f"[WARN] 保存剖析结果失败: {e}")
+
+
+# ================= 命令行子命令 (不启动浏览器) =================
+
+def _file_size(path: Path) -> str:
+    try:
+        return f"{path.stat().st_size / 1024:.1f} KB"
+    except OSError:
+        return "不存在"
+
+
+def cmd_stats():
+    db = open_db(read_only=True)
+    try:
+        statuses = {}
+        total_reads = 0
+        for article in db.iter_articles():
+            statuses[article["status"]] = statuses.get(article["status"], 0) + 1
+            total_reads += article["read_count"]
+        status_str = ", ".join(f"{k} {v}" for k, v in sorted(statuses.items())) or "空"
+        last_sync = db.last_sync_date() or "从未"
+        print(f"[STATS] 数据库: {db.db_path} ({DB_STORAGE_MODE}, {_file_size(db.db_path)})")
+        print(f"[STATS] 文章: 共 {db.article_count()} 篇 ({status_str})，累计阅读 {total_reads} 次")
+        print(f"[STATS] 上次同步: {last_sync}{'' if db.needs_sync() else ' (今日已同步)'}")
+        print(f"[STATS] 权重分桶: {format_tier_sizes(db.tier_sizes())}")
+    finally:
+        db.close()
+
+
+def cmd_plan():
+    """按当前库存预览今日阅读计划，不修改数据库"""
+    db = open_db(read_only=True)
+    try:
+        targets = db.get_weighted_candidates()
+        if not targets:
+            print("[PLAN] 暂无待读文章")
+            return
+        print(f"[PLAN] 今日将阅读 {len(targets)} 篇:")
+        for i, article in enumerate(targets, 1):
+            print(f"  {i:>2}. [已读 {article.get('read_count', 0):>3} 次] "
+                  f"{article.get('title', '')[:40]}  {article['url']}")
+    finally:
+        db.close()
+
+
+def cmd_export(fmt: str, output: str = None):
+    """逐篇写出，不在内存中构造完整列表；只读打开，导出不改动库文件"""
+    db = open_db(read_only=True)
+    out = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    count = 0
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(out, fieldnames=ARTICLE_FIELDS)
+            writer.writeheader()
+            for article in db.iter_articles():
+                writer.writerow(article)
+                count += 1
+        else:
+            for article in db.iter_articles():
+                out.write(json.dumps(article, ensure_ascii=False) + "\n")
+                count += 1
+    finally:
+        if output:
+            out.close()
+        db.close()
+    if output:
+        print(f"[EXPORT] 已导出 {count} 篇到 {output}")
+
+
+def cmd_compact():
+    """整理数据库文件：JSON 库落成快照并清空变更日志，SQLite 库合并 WAL 并 VACUUM"""
+    db = open_db()
+    before = _file_size(db.db_path)
+    db.compact()
+    db.close()
+    print(f"[DB] 整理完成: {db.db_path} {before} -> {_file_size(db.db_path)}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="头条主页文章同步与模拟阅读")
+    profile_help = f"在 cProfile/tracemalloc 下运行并采样事件循环延迟，结果写入 {DEBUG_DIR}"
+    parser.add_argument("--profile", action="store_true", help=profile_help)
+    sub = parser.add_subparsers(dest="command")
+    run = sub.add_parser("run", help="同步文章列表并执行今日阅读 (默认)")
+    run.add_argument("--profile", action="store_true", default=argparse.SUPPRESS, help=profile_help)
+    sub.add_parser("report", help="从事件日志重新生成按日期分页的 HTML 报告")
+    metrics = sub.add_parser("metrics", help="汇总最近若干次运行的指标")
+    metrics.add_argument("--last", type=int, default=12, help="汇总的运行次数 (默认 12，约一天)")
+    sub.add_parser("stats", help="查看库存统计")
+    plan = sub.add_parser("plan", help="预览今日阅读计划")
+    plan.add_argument("--dry-run", action="store_true", help="只预览 (plan 从不修改数据库，可省略)")
+    export = sub.add_parser("export", help="导出文章列表")
+    export.add_argument("--format", choices=("csv", "jsonl"), default="jsonl")
+    export.add_argument("--output", "-o", help="输出文件 (默认标准输出)")
+    sub.add_parser("compact", help="整理数据库文件")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.command == "report":
+        render_report()
+    elif args.command == "metrics":
+        print_metrics(args.last)
+    elif args.command == "stats":
+        cmd_stats()
+    elif args.command == "plan":
+        cmd_plan()
+    elif args.command == "export":
+        cmd_export(args.format, args.output)
+    elif args.command == "compact":
+        cmd_compact()
+    elif args.profile:
+        run_profiled()
+    else:
+        asyncio.run(main())